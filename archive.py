@@ -0,0 +1,209 @@
+"""Arquivo em disco, somente de acréscimo, com os genomas de todas as gerações.
+
+Cada geração avaliada acrescenta seus genomas achatados (`weights_ih` seguido
+de `weights_ho`) a um arquivo de registros de tamanho fixo, ordenados do
+maior para o menor fitness, junto com o fitness e o score de cada um. Um
+índice guarda onde começa cada geração. A leitura é feita por `np.memmap`,
+então o uso de memória não cresce com o tamanho do treino.
+
+Exemplo:
+    archive = GenomeArchive('arquivo_genomas')
+    melhores = archive.top_k(50)
+    populacao = archive.genomes(melhores['row'])
+"""
+import json
+import os
+
+import numpy as np
+
+from neural_network import PopulationBrain
+from population import Population
+
+FORMAT_VERSION = 1
+
+RECORD_DTYPE = np.dtype([('generation', '<i8'), ('rank', '<i8'), ('fitness', '<f8'), ('score', '<f8')])
+INDEX_DTYPE = np.dtype([('generation', '<i8'), ('start', '<i8'), ('count', '<i8')])
+
+class GenomeArchive:
+    """Genomas, fitness e scores de cada geração em arquivos de registros fixos.
+
+    `genomes.f64` tem uma linha de `genome_size` floats por genoma,
+    `records.bin` uma linha de `RECORD_DTYPE` por genoma e `index.bin` uma
+    linha de `INDEX_DTYPE` por geração. O índice é gravado por último, então
+    uma escrita interrompida é descartada ao reabrir o arquivo.
+    """
+    CHUNK_ROWS = 1 << 20 # Registros lidos por vez em `top_k`
+
+    def __init__(self, directory, input_nodes=Population.INPUT_NODES, hidden_nodes=Population.HIDDEN_NODES,
+                 output_nodes=Population.OUTPUT_NODES):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['version'] != FORMAT_VERSION:
+                raise ValueError(f"Versão de arquivo de genomas não suportada: {meta['version']!r}")
+            input_nodes, hidden_nodes, output_nodes = meta['input_nodes'], meta['hidden_nodes'], meta['output_nodes']
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump({'version': FORMAT_VERSION, 'input_nodes': input_nodes,
+                           'hidden_nodes': hidden_nodes, 'output_nodes': output_nodes}, f)
+        self.shape_ih = (hidden_nodes, input_nodes)
+        self.shape_ho = (output_nodes, hidden_nodes)
+        self.genome_size = hidden_nodes * input_nodes + output_nodes * hidden_nodes
+
+        self._genomes_path = os.path.join(directory, 'genomes.f64')
+        self._records_path = os.path.join(directory, 'records.bin')
+        self._index_path = os.path.join(directory, 'index.bin')
+        self._views = None
+        index = self._read_index()
+        self._truncate(int(index['start'][-1] + index['count'][-1]) if len(index) else 0, len(index))
+
+    def _read_index(self):
+        if not os.path.exists(self._index_path):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        count = os.path.getsize(self._index_path) // INDEX_DTYPE.itemsize
+        return np.fromfile(self._index_path, dtype=INDEX_DTYPE, count=count)
+
+    def _truncate(self, rows, generations):
+        """Corta os arquivos para `rows` genomas e `generations` gerações."""
+        for path, size in ((self._genomes_path, rows * self.genome_size * 8),
+                           (self._records_path, rows * RECORD_DTYPE.itemsize),
+                           (self._index_path, generations * INDEX_DTYPE.itemsize)):
+            with open(path, 'ab') as f:
+                f.truncate(size)
+        self._views = None
+
+    def _open(self):
+        """Mapeia os arquivos (uma vez por acréscimo) e retorna `(genomes, records, index)`."""
+        if self._views is None:
+            index = self._read_index()
+            rows = int(index['start'][-1] + index['count'][-1]) if len(index) else 0
+            if rows:
+                genomes = np.memmap(self._genomes_path, dtype='<f8', mode='r', shape=(rows, self.genome_size))
+                records = np.memmap(self._records_path, dtype=RECORD_DTYPE, mode='r', shape=(rows,))
+            else:
+                genomes = np.empty((0, self.genome_size))
+                records = np.empty(0, dtype=RECORD_DTYPE)
+            self._views = genomes, records, index
+        return self._views
+
+    def __len__(self):
+        return len(self._open()[2])
+
+    @property
+    def rows(self):
+        """Total de genomas guardados."""
+        return len(self._open()[1])
+
+    @property
+    def last_generation(self):
+        """Número da última geração guardada (0 se o arquivo estiver vazio)."""
+        index = self._open()[2]
+        return int(index['generation'][-1]) if len(index) else 0
+
+    def rewind(self, generation):
+        """Descarta `generation` e as seguintes, para um treino retomado de um checkpoint anterior."""
+        index = self._read_index()
+        repeated = np.flatnonzero(index['generation'] >= generation)
+        if len(repeated):
+            first = repeated[0]
+            self._truncate(int(index['start'][first]), int(first))
+
+    def new_run(self):
+        """Arquivo vazio para outro treino, no primeiro diretório livre entre `<directory>_2`, `_3`..."""
+        number = 2
+        while os.path.exists(f"{self.directory}_{number}"):
+            number += 1
+        return GenomeArchive(f"{self.directory}_{number}", self.shape_ih[1], self.shape_ih[0], self.shape_ho[0])
+
+    def append(self, generation, genomes, fitness, scores):
+        """Acrescenta uma geração avaliada: `genomes` (PopulationBrain), fitness e score de cada um.
+
+        As gerações só crescem: para gravar de novo uma geração que já está no
+        arquivo, ela precisa ser descartada antes com `rewind`.
+        """
+        index = self._read_index()
+        if len(index) and index['generation'][-1] >= generation:
+            raise ValueError(f"A geração {generation} não vem depois da última do arquivo ({index['generation'][-1]})")
+        start = int(index['start'][-1] + index['count'][-1]) if len(index) else 0
+
+        order = np.argsort(-np.asarray(fitness), kind='stable')
+        flat = np.concatenate([genomes.weights_ih.reshape(len(genomes), -1),
+                               genomes.weights_ho.reshape(len(genomes), -1)], axis=1)[order]
+        records = np.empty(len(order), dtype=RECORD_DTYPE)
+        records['generation'] = generation
+        records['rank'] = np.arange(len(order))
+        records['fitness'] = np.asarray(fitness)[order]
+        records['score'] = np.asarray(scores)[order]
+
+        with open(self._genomes_path, 'ab') as f:
+            f.write(flat.astype('<f8').tobytes())
+        with open(self._records_path, 'ab') as f:
+            f.write(records.tobytes())
+        # O índice por último: só então a geração passa a existir
+        with open(self._index_path, 'ab') as f:
+            f.write(np.array([(generation, start, len(order))], dtype=INDEX_DTYPE).tobytes())
+        self._views = None
+
+    def generations(self):
+        """Números das gerações guardadas, em ordem."""
+        return np.array(self._open()[2]['generation'])
+
+    def _span(self, generation):
+        index = self._open()[2]
+        position = np.searchsorted(index['generation'], generation)
+        if position == len(index) or index['generation'][position] != generation:
+            raise KeyError(f"Geração {generation} não está no arquivo")
+        return int(index['start'][position]), int(index['count'][position])
+
+    def generation(self, generation):
+        """Views `(genomes, records)` da geração, do melhor para o pior fitness."""
+        start, count = self._span(generation)
+        genomes, records, _ = self._open()
+        return genomes[start:start + count], records[start:start + count]
+
+    def row(self, generation, rank):
+        """Linha global do genoma de posição `rank` (0 = melhor) na geração."""
+        start, count = self._span(generation)
+        if not 0 <= rank < count:
+            raise IndexError(f"A geração {generation} tem {count} genomas")
+        return start + rank
+
+    def genomes(self, rows):
+        """Copia as linhas `rows` para um `PopulationBrain`, pronto para uma nova população."""
+        flat = np.array(self._open()[0][np.asarray(rows, dtype=np.int64)])
+        split = self.shape_ih[0] * self.shape_ih[1]
+        return PopulationBrain(flat[:, :split].reshape(-1, *self.shape_ih), flat[:, split:].reshape(-1, *self.shape_ho))
+
+    def network(self, generation, rank=0):
+        """`NeuralNetwork` do genoma de posição `rank` na geração."""
+        return self.genomes([self.row(generation, rank)]).network(0)
+
+    def top_k(self, k, key='score'):
+        """Os `k` melhores genomas de todas as gerações por `key` ('score' ou 'fitness').
+
+        Retorna um array estruturado com `row`, `generation`, `rank`, `fitness`
+        e `score`, do melhor para o pior (empates pela ordem no arquivo). O
+        arquivo é lido em blocos, então a memória usada não depende do seu tamanho.
+        """
+        records = self._open()[1]
+        k = min(k, len(records))
+        best_rows = np.empty(0, dtype=np.int64)
+        best_values = np.empty(0)
+        # Percorre o arquivo em blocos, mantendo só os k melhores até agora
+        for start in range(0, len(records), self.CHUNK_ROWS):
+            values = np.concatenate([best_values, records[key][start:start + self.CHUNK_ROWS]])
+            rows = np.concatenate([best_rows, np.arange(start, start + len(values) - len(best_values))])
+            if len(values) > k:
+                keep = np.argpartition(-values, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+                values, rows = values[keep], rows[keep]
+            best_values, best_rows = values, rows
+        order = np.lexsort((best_rows, -best_values))
+
+        result = np.empty(len(order), dtype=[('row', '<i8')] + RECORD_DTYPE.descr)
+        result['row'] = best_rows[order]
+        for name in RECORD_DTYPE.names:
+            result[name] = records[name][result['row']]
+        return result
@@ -0,0 +1,294 @@
+"""Benchmarks da simulação e do algoritmo genético, sem interface gráfica.
+
+Exemplos:
+    python benchmarks.py decision-interval --population 500 --generations 30 --seed 0
+    python benchmarks.py suite --json benchmark_baseline.json
+    python benchmarks.py suite --baseline benchmark_baseline.json --tolerance 0.15
+    python benchmarks.py optimizers --target 2000 --population 200 --seeds 0 1 2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+# Mantém o stdout limpo para as tabelas e o JSON
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from config import Config
+from flappy_bird_ai import FlappyBirdAI, GameState
+from headless import HeadlessTrainer
+from neural_network import NeuralNetwork
+from optimizers import OPTIMIZERS
+from population import Population
+
+SUITE_SIZES = (50, 500, 5000, 50000)
+STEP_FRAMES = 10 # Frames medidos em cada episódio novo de `step` (todos os pássaros ainda vivos)
+
+
+def bench_decision_interval(intervals=Config.DECISION_INTERVALS, population=500, generations=30,
+                            time_budget=None, seed=0, mode='hold'):
+    """Treina com cada intervalo de decisão e mede frames por segundo e score final.
+
+    Todos os intervalos usam a mesma semente, ou seja, a mesma população
+    inicial e a mesma sequência de percursos.
+    """
+    results = []
+    for interval in intervals:
+        trainer = HeadlessTrainer(population, Config.MUTATION_RATE, ['elitism'], seed=seed,
+                                  decision_interval=interval, decision_mode=mode)
+        history = list(trainer.run(generations, time_budget))
+        trainer.close()
+
+        frames = sum(result['frames'] for result in history)
+        seconds = sum(result['seconds'] for result in history)
+        results.append({
+            'decision_interval': interval,
+            'decision_mode': mode,
+            'generations': len(history),
+            'fps': round(frames / seconds, 1) if seconds else 0.0,
+            'final_best_score': history[-1]['best_score'] if history else 0,
+            'best_score': max((result['best_score'] for result in history), default=0),
+        })
+    return results
+
+
+def _measure(run, setup=None, repeat=5, min_time=0.05):
+    """Segundos por chamada de `run`: o menor valor entre `repeat` rodadas.
+
+    Cada rodada chama `run` até somar `min_time` segundos. `setup`, se
+    informado, prepara o argumento de cada chamada fora da medição.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        calls, elapsed = 0, 0.0
+        while calls == 0 or elapsed < min_time:
+            argument = setup() if setup else None
+            start = time.perf_counter()
+            run(argument)
+            elapsed += time.perf_counter() - start
+            calls += 1
+        best = min(best, elapsed / calls)
+    return best
+
+
+def _training_game(population, seed=0):
+    """Jogo headless já no treino, com `population` pássaros e todas as melhorias ligadas."""
+    game = FlappyBirdAI(headless=True, seed=seed)
+    game.config.POPULATION_SIZE = population
+    for name in game.ga_enhancements:
+        game.ga_enhancements[name] = True
+    game.switch_mode(GameState.TRAINING, force_restart=True)
+    return game
+
+
+def _row(benchmark, population, value, unit):
+    return {'benchmark': benchmark, 'population': population, 'value': value, 'unit': unit}
+
+
+def bench_micro(sizes=SUITE_SIZES, repeat=5, seed=0):
+    """Mede em milissegundos os caminhos quentes, para cada tamanho de população.
+
+    `network_predict` e `network_mutate` medem uma única `NeuralNetwork` (o
+    caminho do modo jogador vs. IA e do `np.vectorize`); os demais, a
+    população inteira.
+    """
+    rng = np.random.default_rng(seed)
+    network = NeuralNetwork(Population.INPUT_NODES, Population.HIDDEN_NODES, Population.OUTPUT_NODES, rng)
+    inputs = rng.random(Population.INPUT_NODES).tolist()
+    rows = [
+        _row('network_predict', 1, _measure(lambda _: network.predict(inputs), repeat=repeat) * 1000, 'ms'),
+        _row('network_mutate', 1, _measure(lambda copy: copy.mutate(Config.MUTATION_RATE, rng), network.copy,
+                                           repeat=repeat) * 1000, 'ms'),
+    ]
+    for size in sizes:
+        game = _training_game(size, seed)
+        population = game.population
+        batch = rng.random((size, Population.INPUT_NODES))
+        rows.append(_row('predict', size, _measure(lambda _: population.genomes.predict(batch), repeat=repeat) * 1000, 'ms'))
+        rows.append(_row('mutate', size, _measure(lambda _: population.genomes.mutate(Config.MUTATION_RATE, rng),
+                                                  repeat=repeat) * 1000, 'ms'))
+
+        def score_generation(_=None):
+            # Scores sorteados para a seleção ter o que ordenar
+            game.population.score[:] = rng.integers(0, 2000, len(game.population))
+        rows.append(_row('next_generation', size, _measure(lambda _: game.next_generation(), score_generation,
+                                                           repeat=repeat) * 1000, 'ms'))
+
+        def new_episode(_=None):
+            game.switch_mode(GameState.TRAINING, force_restart=True)
+        def steps(_):
+            for _ in range(STEP_FRAMES):
+                game.step()
+        rows.append(_row('step', size, _measure(steps, new_episode, repeat=repeat) / STEP_FRAMES * 1000, 'ms'))
+    return rows
+
+
+def bench_generations(population=500, generations=10, seed=0, repeat=3):
+    """Treino de ponta a ponta: gerações e frames por segundo, e o melhor score (deve ser sempre o mesmo).
+
+    O treino roda `repeat` vezes com a mesma semente e vale a rodada mais
+    rápida, como em `_measure`: uma única rodada varia demais para o `compare`.
+    """
+    best = None
+    for _ in range(repeat):
+        trainer = HeadlessTrainer(population, Config.MUTATION_RATE, ['elitism'], seed=seed)
+        start = time.perf_counter()
+        history = list(trainer.run(generations))
+        elapsed = time.perf_counter() - start
+        trainer.close()
+        if best is None or elapsed < best[0]:
+            best = (elapsed, history)
+    elapsed, history = best
+    frames = sum(result['frames'] for result in history)
+    return [
+        _row('generations_per_second', population, len(history) / elapsed, 'gen/s'),
+        _row('frames_per_second', population, frames / elapsed, 'frames/s'),
+        _row('best_score', population, max(result['best_score'] for result in history), 'score'),
+    ]
+
+
+def bench_optimizers(optimizers=tuple(OPTIMIZERS), target=2000, population=200, seeds=(0, 1, 2), max_generations=100):
+    """Segundos de CPU (do processo) e gerações até o melhor genoma da geração chegar a `target` de score.
+
+    Cada otimizador treina uma vez por semente; o episódio é limitado a
+    `target` frames, então nenhum tempo é gasto depois de atingir a meta.
+    As medianas consideram só as rodadas que chegaram lá.
+    """
+    results = []
+    for name in optimizers:
+        cpu_seconds, generations = [], []
+        for seed in seeds:
+            trainer = HeadlessTrainer(population, Config.MUTATION_RATE, ['elitism'], seed=seed, max_frames=target,
+                                      optimizer=name)
+            start = time.process_time()
+            for result in trainer.run(max_generations):
+                if result['best_score'] >= target:
+                    cpu_seconds.append(time.process_time() - start)
+                    generations.append(result['generation'])
+                    break
+            trainer.close()
+        results.append({
+            'optimizer': name,
+            'target': target,
+            'population': population,
+            'solved': f"{len(cpu_seconds)}/{len(seeds)}",
+            'median_cpu_seconds': round(float(np.median(cpu_seconds)), 2) if cpu_seconds else '',
+            'max_cpu_seconds': round(max(cpu_seconds), 2) if cpu_seconds else '',
+            'median_generations': float(np.median(generations)) if generations else '',
+        })
+    return results
+
+
+def compare(rows, baseline, tolerance=0.15):
+    """Acrescenta a cada linha o valor do `baseline` e o veredito dentro de `tolerance`.
+
+    Tempos (ms) pioram quando sobem e taxas quando caem; o score tem de ser
+    idêntico, pois a semente é a mesma. Retorna se houve alguma regressão.
+    """
+    reference = {(row['benchmark'], row['population']): row['value'] for row in baseline}
+    regressed = False
+    for row in rows:
+        old = reference.get((row['benchmark'], row['population']))
+        if old is None:
+            row['baseline'], row['change'], row['status'] = '', '', 'NOVO'
+            continue
+        row['baseline'] = old
+        change = row['value'] / old - 1 if old else 0.0
+        row['change'] = f"{change:+.1%}"
+        if row['unit'] == 'score':
+            status = 'OK' if row['value'] == old else 'DIFERENTE'
+        else:
+            worse = change if row['unit'] == 'ms' else -change
+            status = 'REGRESSÃO' if worse > tolerance else 'MELHORA' if worse < -tolerance else 'OK'
+        row['status'] = status
+        regressed = regressed or status in ('REGRESSÃO', 'DIFERENTE')
+    return regressed
+
+
+def _machine():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def _print_table(rows):
+    columns = list(rows[0])
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Flappy Bird AI.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    decision = subparsers.add_parser('decision-interval', help="Compara intervalos de decisão (k = 1, 2, 4, 8)")
+    decision.add_argument('--intervals', type=int, nargs='+', default=list(Config.DECISION_INTERVALS))
+    decision.add_argument('--mode', choices=['hold', 'once'], default='hold')
+    decision.add_argument('--population', type=int, default=500)
+    decision.add_argument('--generations', type=int, default=30)
+    decision.add_argument('--time-budget', type=float, default=None, help="Tempo máximo por intervalo, em segundos")
+    decision.add_argument('--seed', type=int, default=0)
+    decision.add_argument('--json', default=None, help="Também salva os resultados neste arquivo JSON")
+
+    suite = subparsers.add_parser('suite', help="Mede predict, mutate, next_generation, step e gerações por segundo")
+    suite.add_argument('--sizes', type=int, nargs='+', default=list(SUITE_SIZES), help="Tamanhos de população")
+    suite.add_argument('--repeat', type=int, default=5, help="Rodadas por medição (vale a mais rápida)")
+    suite.add_argument('--population', type=int, default=500, help="População do treino de ponta a ponta")
+    suite.add_argument('--generations', type=int, default=10, help="Gerações do treino de ponta a ponta")
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--json', default=None, help="Salva os resultados neste arquivo JSON (que pode servir de baseline)")
+    suite.add_argument('--baseline', default=None, help="Compara com os resultados de um JSON salvo antes com --json")
+    suite.add_argument('--tolerance', type=float, default=0.15, help="Variação aceita em relação ao baseline (padrão: 0.15)")
+
+    optimizers = subparsers.add_parser('optimizers', help="Segundos de CPU até um score alvo para cada otimizador")
+    optimizers.add_argument('--optimizers', nargs='+', choices=list(OPTIMIZERS), default=list(OPTIMIZERS))
+    optimizers.add_argument('--target', type=int, default=2000, help="Score alvo (frames) do melhor pássaro da geração")
+    optimizers.add_argument('--population', type=int, default=200)
+    optimizers.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    optimizers.add_argument('--max-generations', type=int, default=100, help="Desiste da semente depois de N gerações")
+    optimizers.add_argument('--json', default=None, help="Também salva os resultados neste arquivo JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    regressed = False
+    if args.benchmark == 'decision-interval':
+        rows = bench_decision_interval(args.intervals, args.population, args.generations,
+                                       args.time_budget, args.seed, args.mode)
+        output = rows
+    elif args.benchmark == 'optimizers':
+        rows = bench_optimizers(args.optimizers, args.target, args.population, args.seeds, args.max_generations)
+        output = rows
+    elif args.benchmark == 'suite':
+        rows = bench_micro(args.sizes, args.repeat, args.seed) + bench_generations(args.population, args.generations, args.seed, args.repeat)
+        for row in rows:
+            row['value'] = round(row['value'], 4)
+        output = {'machine': _machine(), 'results': [dict(row) for row in rows]}
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressed = compare(rows, json.load(f)['results'], args.tolerance)
+
+    _print_table(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Resultados salvos em '{args.json}'", file=sys.stderr)
+    if regressed:
+        print("Há regressões em relação ao baseline.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,77 @@
 import pygame
-from neural_network import NeuralNetwork
+from neural_network import NeuralNetwork, PopulationBrain
+from population import Population
+from text_cache import TextCache
+
+def _slot_property(name):
+    """Expõe `population.<name>[index]` como atributo do pássaro."""
+    def getter(self):
+        return getattr(self.population, name)[self.index]
+    def setter(self, value):
+        getattr(self.population, name)[self.index] = value
+    return property(getter, setter)
 
 class Bird:
-    def __init__(self, brain=None, is_player=False):
-        self.x = 50
-        self.y = 300
-        self.width = 34
-        self.height = 24
-        self.gravity = 0.25
-        self.lift = -6.5
-        self.velocity = 0
-        
-        self.score = 0
-        self.fitness = 0
+    """View fina sobre um slot de uma `Population`.
+
+    Sem `population`, o pássaro cria uma população própria de tamanho 1, o que
+    mantém o uso avulso (modo jogador vs. IA) igual ao de antes.
+    """
+    y = _slot_property('y')
+    velocity = _slot_property('velocity')
+    score = _slot_property('score')
+    fitness = _slot_property('fitness')
+    flapping = _slot_property('flapping')
+    # Atributos para fitness aprimorado
+    pipes_passed = _slot_property('pipes_passed')
+
+    # Fonte e textos dos rótulos, compartilhados por todos os pássaros
+    label_cache = TextCache(max_entries=32)
+    _label_font = None
+
+    def __init__(self, brain=None, is_player=False, population=None, index=0):
+        if population is None:
+            brain = brain.copy() if isinstance(brain, NeuralNetwork) else NeuralNetwork(5, 8, 1)
+            population = Population(PopulationBrain.from_networks([brain]))
+        self.population = population
+        self.index = index
         self.is_player = is_player
-        self.lost = False
-        
-        # Atributos para fitness aprimorado
-        self.pipes_passed = 0
-        
-        if isinstance(brain, NeuralNetwork):
-            self.brain = brain.copy()
-        else:
-            self.brain = NeuralNetwork(5, 8, 1)
 
-    def think(self, pipes, canvas_height, canvas_width):
+        self.x = population.X
+        self.width = population.WIDTH
+        self.height = population.HEIGHT
+        self.gravity = population.GRAVITY
+        self.lift = population.LIFT
+
+    @classmethod
+    def view(cls, population, index):
+        """Cria uma view sobre o slot `index` de uma população existente."""
+        return cls(population=population, index=index)
+
+    @property
+    def brain(self):
+        return self.population.genomes.network(self.population.genome_index(self.index))
+
+    @property
+    def lost(self):
+        return not self.population.alive[self.index]
+
+    @lost.setter
+    def lost(self, value):
+        if value:
+            self.population.kill(self.population.slots == self.index)
+
+    def think(self, pipe_features, canvas_height):
         if self.is_player:
             return
 
-        closest_pipe = self._find_closest_pipe(pipes)
-        
-        if closest_pipe:
-            pipe_width = 52 # TODO: Obter de uma config
-            pipe_gap = 180 # TODO: Obter de uma config
-            inputs = [
-                self.y / canvas_height,
-                self.velocity / 10,
-                closest_pipe['x'] / canvas_width,
-                closest_pipe['top_height'] / canvas_height,
-                (closest_pipe['top_height'] + pipe_gap) / canvas_height
-            ]
-        else:
-            # Valores padrão quando não há canos
-            inputs = [self.y / canvas_height, self.velocity / 10, 0.5, 0.5, 0.5]
-        
-        if self.brain.predict(inputs) > 0.5:
+        self.flapping = self.brain.predict(self.get_inputs(pipe_features, canvas_height)) > 0.5
+        if self.flapping:
             self.flap()
 
-    def _find_closest_pipe(self, pipes):
-        """Encontra o cano mais próximo à frente do pássaro."""
-        for pipe in pipes:
-            pipe_width = 52 # TODO: Obter de uma config
-            if pipe['x'] + pipe_width > self.x:
-                return pipe
-        return None
+    def get_inputs(self, pipe_features, canvas_height):
+        """Monta as 5 entradas da rede neural; `pipe_features` são as 3 do próximo cano (`PipeRing.features`)."""
+        return [self.y / canvas_height, self.velocity / 10, *pipe_features]
 
     def flap(self):
         self.velocity = self.lift
@@ -67,22 +85,13 @@ class Bird:
         pygame.draw.rect(screen, color, (self.x, self.y, self.width, self.height))
         
         if text:
-            font = pygame.font.Font(None, 16)
+            if Bird._label_font is None:
+                Bird._label_font = pygame.font.Font(None, 16)
             text_color = (0, 0, 0) if color == (251, 191, 36) else (255, 255, 255)
-            text_surface = font.render(text, True, text_color)
+            text_surface = self.label_cache.render(Bird._label_font, text, text_color)
             text_rect = text_surface.get_rect(center=(self.x + self.width // 2, self.y + self.height // 2))
             screen.blit(text_surface, text_rect)
 
     def is_offscreen(self, game_height, ground_height):
         """Verifica se o pássaro saiu da tela (chão ou teto)."""
         return self.y + self.height > game_height - ground_height or self.y < 0
-
-    def collides_with(self, pipe, pipe_gap):
-        """Verifica se o pássaro colide com um cano específico."""
-        pipe_width = 52 # TODO: Obter de uma config
-        if (self.x < pipe['x'] + pipe_width and 
-            self.x + self.width > pipe['x'] and
-            (self.y < pipe['top_height'] or 
-             self.y + self.height > pipe['top_height'] + pipe_gap)):
-            return True
-        return False
@@ -0,0 +1,138 @@
+"""Checkpoints do treinamento completo em um único arquivo `.npz`.
+
+O arquivo guarda os genomas de toda a população, o histórico de scores, o
+estado dos geradores aleatórios, as configurações do algoritmo genético e o
+estado do otimizador (estratégia evolutiva), se houver.
+Os arrays são gravados sem compressão, então cada membro pode ser mapeado
+direto do disco (`load_arrays`), e os metadados vão como um texto JSON, sem
+pickle. A gravação é atômica: o checkpoint anterior só é substituído depois
+que o novo está completo no disco.
+
+Um checkpoint representa o início da geração atual: ao retomar, a geração é
+simulada de novo desde o primeiro frame, nos mesmos percursos.
+"""
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from neural_network import PopulationBrain
+from optimizers import optimizer_state, restore_optimizer
+from population import Population
+
+FORMAT_VERSION = 1
+
+# Atributos de `Config` que fazem parte do estado do treino
+SETTINGS = ('POPULATION_SIZE', 'MUTATION_RATE', 'TOURNAMENT_SIZE', 'DECISION_INTERVAL', 'DECISION_MODE',
+            'MAX_EPISODE_FRAMES', 'EVALUATION_COURSES', 'FIXED_COURSES')
+
+def save_checkpoint(game, path):
+    """Grava o estado de treino de `game` (FlappyBirdAI) em `path`."""
+    population = game.population
+    metadata = {
+        'version': FORMAT_VERSION,
+        'seed': game.seed,
+        'generation': game.generation,
+        'best_score': int(game.best_score),
+        'stagnation_count': game.stagnation_count,
+        'previous_best_score': int(game.previous_best_score),
+        'ga_enhancements': game.ga_enhancements,
+        'selection_strategy': game.selection_strategy,
+        'optimizer': game.optimizer_name,
+        'settings': {name: getattr(game.config, name) for name in SETTINGS},
+        'courses': population.courses,
+        'course_seeds': list(game.courses.seeds),
+        'rng_state': game.rng.bit_generator.state,
+        'course_rng_state': game.course_rng.bit_generator.state,
+    }
+    arrays = {
+        'weights_ih': population.genomes.weights_ih,
+        'weights_ho': population.genomes.weights_ho,
+        'generation_scores': np.asarray(game.generation_scores, dtype=np.int64),
+        'metadata': np.array(json.dumps(metadata)),
+    }
+    arrays.update({f'optimizer_{name}': value for name, value in optimizer_state(game.optimizer).items()})
+
+    # Grava ao lado do destino e troca de uma vez, para nunca deixar um checkpoint pela metade
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_arrays(path, mmap_mode='r'):
+    """Abre os arrays de um checkpoint, mapeando do disco os que não estão comprimidos.
+
+    Com `mmap_mode=None`, tudo é lido para a memória como em `np.load`.
+    """
+    if mmap_mode is None:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            # Pula o cabeçalho local do zip e o cabeçalho .npy até o início dos dados
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"Membro '{name}' contém objetos Python e não pode ser mapeado")
+            count = int(np.prod(shape))
+            # Textos, escalares e arrays vazios são pequenos (ou não podem ser mapeados): lê direto
+            if dtype.kind == 'U' or not shape or not count:
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+def load_metadata(arrays):
+    """Decodifica os metadados JSON de um checkpoint aberto com `load_arrays`."""
+    metadata = json.loads(str(arrays['metadata']))
+    if metadata.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Versão de checkpoint não suportada: {metadata.get('version')!r}")
+    return metadata
+
+def restore_checkpoint(game, path):
+    """Restaura em `game` o estado de treino gravado em `path` e entra no modo de treinamento."""
+    from flappy_bird_ai import GameState
+
+    arrays = load_arrays(path)
+    metadata = load_metadata(arrays)
+
+    for name, value in metadata['settings'].items():
+        setattr(game.config, name, value)
+    game.seed = metadata['seed']
+    game.generation = metadata['generation']
+    game.best_score = metadata['best_score']
+    game.stagnation_count = metadata['stagnation_count']
+    game.previous_best_score = metadata['previous_best_score']
+    game.ga_enhancements.update(metadata['ga_enhancements'])
+    game.selection_strategy = metadata['selection_strategy']
+    # Checkpoints anteriores aos otimizadores não têm a chave: eram sempre do algoritmo genético
+    state = {name[len('optimizer_'):]: value for name, value in arrays.items() if name.startswith('optimizer_')}
+    game.optimizer_name = metadata.get('optimizer', 'ga')
+    game.optimizer = restore_optimizer(game.optimizer_name, state)
+    game.generation_scores = arrays['generation_scores'].tolist()
+    game.rng.bit_generator.state = metadata['rng_state']
+    game.course_rng.bit_generator.state = metadata['course_rng_state']
+
+    # Copia os genomas: a população é alterada no lugar (migração) e o mapeamento é só leitura
+    genomes = PopulationBrain(np.array(arrays['weights_ih']), np.array(arrays['weights_ho']))
+    game.game_state = GameState.TRAINING
+    game.population = Population(genomes, metadata['courses'])
+    # Com percursos fixos, as gerações seguintes continuam nos percursos gravados
+    game.fixed_course_seeds = np.array(metadata['course_seeds'], dtype=np.int64) if game.config.FIXED_COURSES else None
+    game._new_course(metadata['course_seeds'])
@@ -0,0 +1,45 @@
+import numpy as np
+
+class CollisionEngine:
+    """Detecção de colisões vetorizada para uma população inteira.
+
+    Lê a geometria dos canos (x e altura do topo) de arrays e devolve a
+    máscara de morte de todos os pássaros em uma única expressão NumPy, com
+    regras AABB (as mesmas de `Bird.is_offscreen` para o chão e o teto). Com
+    vários percursos, `top_height` tem uma linha por percurso e cada pássaro
+    é testado contra a linha do seu.
+    """
+
+    def __init__(self, config, bird_x, bird_width, bird_height):
+        self.config = config
+        self.bird_x = bird_x
+        self.bird_width = bird_width
+        self.bird_height = bird_height
+        self.set_pipes(np.empty(0), np.empty((1, 0)))
+
+    def set_pipes(self, pipe_x, top_height):
+        """Passa a usar os arrays de canos `pipe_x` (canos) e `top_height` (percursos, canos).
+
+        Os arrays não são copiados: o motor lê os valores atuais a cada
+        chamada, então basta chamar uma vez por episódio com os arrays do
+        `PipeRing`. Posições livres têm `x = -inf` e nunca colidem.
+        """
+        self.pipe_x = pipe_x
+        self.top_height = top_height
+
+    def death_mask(self, y, course=0):
+        """Retorna True para cada posição `y` que bate no chão, no teto ou em um cano.
+
+        `course` é o percurso de cada posição (array) ou de todas (escalar).
+        """
+        floor = self.config.GAME_HEIGHT - self.config.GROUND_HEIGHT
+        offscreen = (y + self.bird_height > floor) | (y < 0)
+        # A sobreposição horizontal só depende do cano, pois todos os pássaros têm o mesmo x:
+        # só os canos (em geral nenhum ou um) na altura dos pássaros entram na conta
+        near = np.flatnonzero((self.bird_x < self.pipe_x + self.config.PIPE_WIDTH) & (self.bird_x + self.bird_width > self.pipe_x))
+        if not len(near):
+            return offscreen
+        top_height = self.top_height[course][..., near]
+        column = y[:, np.newaxis]
+        hits_pipe = (column < top_height) | (column + self.bird_height > top_height + self.config.PIPE_GAP)
+        return offscreen | hits_pipe.any(axis=1)
@@ -0,0 +1,65 @@
+# --- Configurações e Constantes ---
+
+class Config:
+    """Agrupa todas as configurações do jogo e da IA."""
+    GAME_WIDTH = 400
+    GAME_HEIGHT = 600
+    UI_PANEL_WIDTH = 400
+    CANVAS_WIDTH = GAME_WIDTH + UI_PANEL_WIDTH
+    CANVAS_HEIGHT = GAME_HEIGHT + 100 # Inclui painel inferior
+
+    PIPE_WIDTH = 52
+    PIPE_GAP = 180
+    PIPE_SPAWN_RATE = 100 # A cada X frames
+    GROUND_HEIGHT = 20
+
+    # Agendamento: quadros desenhados por segundo e, no modo turbo, a cada quantas gerações desenhar
+    TARGET_FPS = 60
+    MAX_SPEED = 10 # Passos por quadro na maior velocidade fixa; acima dela o treino usa o tempo livre do quadro
+    TURBO_RENDER_GENERATIONS = 1
+    TURBO_MAX_RENDER_INTERVAL = 1.0 # Segundos máximos sem desenhar no modo turbo
+    PROFILE_CAPTURE_FRAMES = 300 # Quadros capturados pelo cProfile (tecla C ou --cprofile)
+    
+    POPULATION_SIZE = 50
+    MAX_POPULATION_SIZE = 50000
+    MUTATION_RATE = 0.05
+    TOURNAMENT_SIZE = 3
+    SAVE_FILE = "best_flappy_brain.pkl"
+    CHECKPOINT_FILE = "training_checkpoint.npz"
+    CHECKPOINT_INTERVAL = 10 # Gerações entre checkpoints automáticos
+    REPLAY_DIR = "replays" # Replays do melhor pássaro de cada geração (replay.py)
+    EXPORT_DIR = "exportados" # GIFs e PNGs gerados por export.py
+    EXPORT_FPS = 30 # Quadros por segundo dos GIFs exportados
+
+    # Estratégias evolutivas (optimizers.py), alternativas ao algoritmo genético
+    ES_SIGMA = 0.1 # Desvio do ruído do OpenAI-ES
+    ES_LEARNING_RATE = 0.03 # Passo do Adam no OpenAI-ES
+    CMA_SIGMA = 0.3 # Passo inicial do CMA-ES
+
+    # A rede é consultada a cada DECISION_INTERVAL frames; entre consultas, 'hold'
+    # repete a última decisão e 'once' aplica o pulo só no frame da decisão
+    DECISION_INTERVAL = 1
+    DECISION_INTERVALS = (1, 2, 4, 8)
+    DECISION_MODE = 'hold'
+
+    # Avaliação: o episódio termina quando os sobreviventes chegam a MAX_EPISODE_FRAMES
+    # (None desativa o limite) e o fitness é a média em EVALUATION_COURSES percursos
+    MAX_EPISODE_FRAMES = 10000
+    EVALUATION_COURSES = 1
+    FITNESS_CACHE_SIZE = 100000 # Resultados guardados por (genoma, percurso); 0 desliga o cache
+    # Avalia todas as gerações nos mesmos percursos: elites e filhos sem mutação vêm do cache,
+    # mas o treino pode se especializar nesses percursos
+    FIXED_COURSES = False
+
+    # Modelo de ilhas (islands.py)
+    ISLANDS = 4
+    MIGRATION_INTERVAL = 5 # Gerações entre migrações
+    MIGRANTS = 2 # Melhores pássaros enviados por ilha a cada migração
+    MIGRATION_TOPOLOGY = 'ring' # 'ring' ou 'random'
+
+    # Avaliação distribuída por TCP (distributed.py)
+    DISTRIBUTED_HOST = '127.0.0.1'
+    DISTRIBUTED_PORT = 5555
+    HEARTBEAT_INTERVAL = 1.0 # Segundos entre sinais de vida de um worker ocupado
+    HEARTBEAT_TIMEOUT = 10.0 # Segundos sem notícias até o worker ser dado como perdido
+    CHUNKS_PER_WORKER = 4 # Blocos de genomas por worker conectado em cada geração
@@ -0,0 +1,53 @@
+import numpy as np
+from config import Config
+
+class Course:
+    """Sequência pré-calculada das alturas dos canos para uma semente.
+
+    As alturas ficam em um array `int16` compacto e a simulação as lê pelo
+    índice do cano, de modo que a mesma semente gera sempre o mesmo percurso,
+    em qualquer processo. O array cresce em blocos de tamanho fixo quando um
+    episódio passa do fim, então o percurso não depende de quando é lido.
+    """
+    CHUNK_SIZE = 256
+
+    def __init__(self, seed, config=Config):
+        self.seed = seed
+        self.low = 50
+        self.high = config.GAME_HEIGHT - config.PIPE_GAP - 100
+        self._rng = np.random.default_rng(seed)
+        self.top_heights = np.empty(0, dtype=np.int16)
+        self._extend()
+
+    def _extend(self):
+        chunk = self._rng.integers(self.low, self.high, size=self.CHUNK_SIZE, dtype=np.int16, endpoint=True)
+        self.top_heights = np.concatenate([self.top_heights, chunk])
+
+    def __len__(self):
+        return len(self.top_heights)
+
+    def top_height(self, index):
+        """Altura do topo do cano de número `index` (a partir de 0)."""
+        while index >= len(self.top_heights):
+            self._extend()
+        return int(self.top_heights[index])
+
+
+class CourseSet:
+    """Vários percursos com canos nos mesmos frames e alturas diferentes.
+
+    Como os canos de todos os percursos surgem e andam juntos, só a altura
+    muda de um percurso para outro: `top_heights(index)` devolve a altura do
+    cano `index` em cada percurso, e a população avalia todos eles em lote.
+    """
+
+    def __init__(self, seeds, config=Config):
+        self.seeds = tuple(int(seed) for seed in seeds)
+        self.courses = [Course(seed, config) for seed in self.seeds]
+
+    def __len__(self):
+        return len(self.courses)
+
+    def top_heights(self, index):
+        """Altura do topo do cano de número `index` em cada percurso."""
+        return np.array([course.top_height(index) for course in self.courses])
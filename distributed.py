@@ -0,0 +1,356 @@
+"""Avaliação distribuída da população por TCP.
+
+O coordenador (`DistributedEvaluator`, usado pelo treino headless com
+`--listen`) divide cada geração em blocos de genomas e os entrega aos workers
+conectados, que podem estar nesta ou em outras máquinas. Cada worker simula o
+bloco com `evaluate_genomes` e devolve as matrizes de score e canos
+ultrapassados, então o resultado é idêntico, bit a bit, ao de um único
+processo.
+
+Enquanto simula, o worker manda um sinal de vida a cada HEARTBEAT_INTERVAL
+segundos. Um worker que fica HEARTBEAT_TIMEOUT segundos sem responder, ou
+cuja conexão cai, é descartado e o bloco volta para a fila.
+
+As mensagens são um cabeçalho JSON seguido dos bytes crus dos arrays, sem
+pickle: nada do que chega pela rede é executado.
+
+Exemplo (três terminais):
+    python headless.py --population 5000 --generations 50 --listen 0.0.0.0:5555
+    python distributed.py worker --connect coordenador:5555
+    python distributed.py worker --connect coordenador:5555
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Mantém o stdout limpo para as tabelas
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from config import Config
+from neural_network import PopulationBrain
+from parallel import evaluate_genomes
+from population import Population
+
+_LENGTH = struct.Struct('!I')
+MAX_HEADER_BYTES = 1 << 20
+MAX_ARRAY_BYTES = 1 << 32
+ALLOWED_DTYPES = (np.dtype('<f8'), np.dtype('<i8'))
+
+class ProtocolError(Exception):
+    """Mensagem malformada ou inesperada na conexão."""
+
+# --- Protocolo ---
+
+def send_message(sock, header, arrays=()):
+    """Envia `header` (dict JSON) e os `arrays` NumPy que o seguem."""
+    arrays = [np.ascontiguousarray(array) for array in arrays]
+    header = dict(header, arrays=[[array.dtype.str, list(array.shape)] for array in arrays])
+    data = json.dumps(header).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+    for array in arrays:
+        sock.sendall(memoryview(array).cast('B'))
+
+def recv_message(sock):
+    """Recebe uma mensagem de `send_message` e retorna `(header, arrays)`."""
+    (length,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    if length > MAX_HEADER_BYTES:
+        raise ProtocolError(f"Cabeçalho grande demais ({length} bytes)")
+    header = json.loads(_recv_exactly(sock, length))
+    arrays = []
+    for dtype, shape in header.pop('arrays', []):
+        dtype = np.dtype(dtype)
+        if dtype not in ALLOWED_DTYPES or any(size < 0 for size in shape):
+            raise ProtocolError(f"Array não suportado: {dtype} {shape}")
+        nbytes = math.prod(shape) * dtype.itemsize
+        if nbytes > MAX_ARRAY_BYTES:
+            raise ProtocolError(f"Array grande demais ({nbytes} bytes)")
+        arrays.append(np.frombuffer(_recv_exactly(sock, nbytes), dtype=dtype).reshape(shape))
+    return header, arrays
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("Conexão encerrada")
+        view = view[received:]
+    return buffer
+
+def parse_address(text, default_host=Config.DISTRIBUTED_HOST):
+    """'host:porta' (ou só a porta) para a tupla `(host, porta)`."""
+    host, _, port = text.rpartition(':')
+    return host or default_host, int(port)
+
+# --- Coordenador ---
+
+class DistributedEvaluator:
+    """Distribui a avaliação de cada geração entre workers conectados por TCP.
+
+    Tem a mesma interface de `ParallelEvaluator` (`evaluate` e `close`). Os
+    workers podem se conectar e cair a qualquer momento: cada bloco fica na
+    fila até algum worker devolver o resultado.
+    """
+
+    def __init__(self, address=(Config.DISTRIBUTED_HOST, Config.DISTRIBUTED_PORT),
+                 heartbeat_timeout=Config.HEARTBEAT_TIMEOUT, chunks_per_worker=Config.CHUNKS_PER_WORKER):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.chunks_per_worker = chunks_per_worker
+        self.server = socket.create_server(address)
+        self.server.settimeout(Config.HEARTBEAT_INTERVAL) # Para o laço de `accept` perceber o `close`
+        self.address = self.server.getsockname()[:2]
+        self.workers = {} # Endereço -> blocos avaliados, dos workers conectados
+        self.lost_workers = 0
+        self.requeued = 0
+
+        self._tasks = queue.Queue()
+        self._results = {}
+        self._batch = 0
+        self._condition = threading.Condition()
+        self._closing = threading.Event()
+        self._threads = []
+        accept_thread = threading.Thread(target=self._accept_loop, name='coordinator', daemon=True)
+        accept_thread.start()
+        self._threads.append(accept_thread)
+
+    def _accept_loop(self):
+        while not self._closing.is_set():
+            try:
+                conn, address = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            thread = threading.Thread(target=self._serve_worker, args=(conn, address), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _serve_worker(self, conn, address):
+        """Entrega blocos a um worker até ele cair ou o coordenador fechar."""
+        task = None
+        try:
+            conn.settimeout(self.heartbeat_timeout)
+            header, _ = recv_message(conn)
+            if header.get('type') != 'hello':
+                raise ProtocolError(f"Esperava 'hello', recebeu {header.get('type')!r}")
+            with self._condition:
+                self.workers[address] = 0
+                self._condition.notify_all()
+
+            while not self._closing.is_set():
+                try:
+                    task = self._tasks.get(timeout=Config.HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    continue
+                batch, index, weights_ih, weights_ho, course_seeds, settings = task
+                send_message(conn, {'type': 'task', 'batch': batch, 'index': index,
+                                    'course_seeds': [int(seed) for seed in course_seeds], 'settings': settings},
+                             [weights_ih, weights_ho])
+                # Espera o resultado; cada sinal de vida renova o prazo de `heartbeat_timeout`
+                while True:
+                    header, arrays = recv_message(conn)
+                    if header.get('type') == 'heartbeat':
+                        continue
+                    if header.get('type') != 'result' or (header.get('batch'), header.get('index')) != (batch, index):
+                        raise ProtocolError(f"Resposta inesperada: {header!r}")
+                    break
+                with self._condition:
+                    self._results[(batch, index)] = arrays
+                    self.workers[address] += 1
+                    self._condition.notify_all()
+                task = None
+
+            send_message(conn, {'type': 'shutdown'})
+        except (OSError, ProtocolError, ValueError) as error:
+            if self._closing.is_set():
+                return
+            print(f"Worker {address[0]}:{address[1]} perdido ({error or type(error).__name__})", file=sys.stderr)
+            with self._condition:
+                self.lost_workers += 1
+                if task is not None:
+                    # O bloco volta para a fila e será entregue a outro worker
+                    self.requeued += 1
+                    self._tasks.put(task)
+        finally:
+            with self._condition:
+                self.workers.pop(address, None)
+                self._condition.notify_all()
+            conn.close()
+
+    def wait_for_workers(self, count, timeout=None):
+        """Bloqueia até haver `count` workers conectados; retorna se conseguiu."""
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.workers) >= count, timeout)
+
+    def evaluate(self, genomes, course_seeds, settings=None):
+        """Avalia todos os genomas e retorna `(scores, pipes_passed)` na ordem dos slots de `Population`."""
+        with self._condition:
+            self._batch += 1
+            batch = self._batch
+            chunks = min(len(genomes), max(1, len(self.workers)) * self.chunks_per_worker)
+        bounds = np.linspace(0, len(genomes), chunks + 1).astype(int)
+        for index, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            self._tasks.put((batch, index, genomes.weights_ih[start:stop], genomes.weights_ho[start:stop],
+                             course_seeds, settings))
+
+        waiting_since = time.monotonic()
+        warned = False
+        with self._condition:
+            while sum(key[0] == batch for key in self._results) < chunks:
+                if not self.workers and not warned and time.monotonic() - waiting_since > 1:
+                    print(f"Aguardando workers em {self.address[0]}:{self.address[1]}...", file=sys.stderr)
+                    warned = True
+                self._condition.wait(timeout=1)
+            results = [self._results.pop((batch, index)) for index in range(chunks)]
+
+        # Junta os blocos de genomas e achata para o layout percurso-major dos slots
+        scores = np.concatenate([score for score, _ in results], axis=1).ravel()
+        pipes_passed = np.concatenate([pipes for _, pipes in results], axis=1).ravel()
+        return scores, pipes_passed
+
+    def close(self):
+        """Manda os workers conectados encerrarem e fecha o servidor."""
+        self._closing.set()
+        for thread in list(self._threads):
+            thread.join(timeout=Config.HEARTBEAT_INTERVAL * 2)
+        self.server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Worker ---
+
+def run_worker(address, connect_timeout=30.0, heartbeat_interval=Config.HEARTBEAT_INTERVAL):
+    """Conecta ao coordenador em `address` e avalia blocos até ele mandar encerrar.
+
+    Tenta conectar por até `connect_timeout` segundos. Retorna quantos
+    blocos foram avaliados.
+    """
+    from flappy_bird_ai import FlappyBirdAI
+    game = FlappyBirdAI(headless=True)
+    # O bloco de cada worker muda a cada geração; o cache fica só no coordenador
+    game.fitness_cache = None
+
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+    send_lock = threading.Lock()
+    busy = threading.Event()
+    stopped = threading.Event()
+
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            if busy.is_set():
+                try:
+                    with send_lock:
+                        send_message(sock, {'type': 'heartbeat'})
+                except OSError:
+                    return
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    done = 0
+    try:
+        with send_lock:
+            send_message(sock, {'type': 'hello', 'host': socket.gethostname(), 'pid': os.getpid()})
+        while True:
+            header, arrays = recv_message(sock)
+            if header.get('type') == 'shutdown':
+                break
+            if header.get('type') != 'task':
+                raise ProtocolError(f"Mensagem inesperada: {header!r}")
+            busy.set()
+            scores, pipes_passed = evaluate_genomes(PopulationBrain(*arrays), header['course_seeds'], game,
+                                                    header['settings'])
+            busy.clear()
+            with send_lock:
+                send_message(sock, {'type': 'result', 'batch': header['batch'], 'index': header['index']},
+                             [scores.astype('<i8'), pipes_passed.astype('<i8')])
+            done += 1
+    except ConnectionError:
+        pass # O coordenador foi embora
+    finally:
+        stopped.set()
+        sock.close()
+    return done
+
+# --- Benchmark local ---
+
+def bench_scaling(worker_counts=(1, 2, 4), population=2000, generations=3, seed=0):
+    """Mede genomas avaliados por segundo com N workers locais e confere o resultado com um único processo."""
+    rng = np.random.default_rng(seed)
+    genomes = PopulationBrain.random(population, Population.INPUT_NODES, Population.HIDDEN_NODES,
+                                     Population.OUTPUT_NODES, rng)
+    # Um percurso novo por geração, para medir simulação e não resultados repetidos
+    course_seeds = rng.integers(2**63, size=(generations, 1))
+    expected = evaluate_genomes(genomes, course_seeds[-1])
+    expected = expected[0].ravel(), expected[1].ravel()
+
+    rows = []
+    for count in worker_counts:
+        with DistributedEvaluator(('127.0.0.1', 0)) as evaluator:
+            processes = [multiprocessing.Process(target=run_worker, args=(evaluator.address,)) for _ in range(count)]
+            for process in processes:
+                process.start()
+            evaluator.wait_for_workers(count)
+
+            start = time.perf_counter()
+            for seeds in course_seeds:
+                scores, pipes_passed = evaluator.evaluate(genomes, seeds)
+            elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+        rows.append({
+            'workers': count,
+            'genomes_per_second': round(population * generations / elapsed, 1),
+            'identical': bool(np.array_equal(scores, expected[0]) and np.array_equal(pipes_passed, expected[1])),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avaliação distribuída do Flappy Bird AI por TCP.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker = subparsers.add_parser('worker', help="Avalia blocos de genomas para um coordenador")
+    worker.add_argument('--connect', default=f"{Config.DISTRIBUTED_HOST}:{Config.DISTRIBUTED_PORT}",
+                        help=f"Endereço do coordenador (padrão: {Config.DISTRIBUTED_HOST}:{Config.DISTRIBUTED_PORT})")
+    worker.add_argument('--connect-timeout', type=float, default=30.0, help="Segundos tentando conectar (padrão: 30)")
+
+    bench = subparsers.add_parser('bench', help="Mede a vazão com 1, 2, 4... workers locais")
+    bench.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    bench.add_argument('--population', type=int, default=2000)
+    bench.add_argument('--generations', type=int, default=3)
+    bench.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        done = run_worker(parse_address(args.connect), args.connect_timeout)
+        print(f"Worker encerrado após {done} bloco(s)", file=sys.stderr)
+    else:
+        print("workers  genomas/s  idêntico")
+        for row in bench_scaling(args.workers, args.population, args.generations, args.seed):
+            print(f"{row['workers']:<7}  {row['genomes_per_second']:<9}  {row['identical']}")
+
+
+if __name__ == "__main__":
+    main()
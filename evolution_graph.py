@@ -0,0 +1,90 @@
+import math
+
+import pygame
+
+class EvolutionGraph:
+    """Gráfico de evolução dos scores mantido em uma superfície própria.
+
+    O histórico é reduzido a no máximo `max_points` baldes com o mínimo e o
+    máximo dos scores de gerações consecutivas. Quando os baldes acabam, cada
+    par vizinho é fundido e o tamanho do balde dobra, então a memória e o
+    custo de desenho não crescem com o número de gerações. Cada nova geração
+    redesenha só a última coluna do gráfico; o gráfico inteiro só é refeito
+    quando os baldes são fundidos ou a escala vertical muda, e a escala cresce
+    em potências de 2 para que isso aconteça poucas vezes.
+    """
+
+    def __init__(self, width, height, colors, max_points=120):
+        self.width = width
+        self.height = height
+        self.colors = colors
+        self.max_points = max_points
+        self.surface = pygame.Surface((width, height))
+        self.source = None # Lista de scores que o gráfico acompanha
+        self.reset()
+
+    def reset(self):
+        """Esvazia o gráfico."""
+        self.count = 0 # Gerações já incluídas
+        self.bucket_size = 1 # Gerações por balde (todos cheios, exceto o último)
+        self.mins = []
+        self.maxs = []
+        self.fills = []
+        self.scale = 1
+        self.surface.fill(self.colors.DARK_GRAY)
+
+    def sync(self, scores):
+        """Inclui os scores novos de `scores`; recomeça se a lista foi trocada ou encurtada."""
+        if scores is not self.source or len(scores) < self.count:
+            self.source = scores
+            self.reset()
+        for score in scores[self.count:]:
+            self.append(score)
+
+    def append(self, score):
+        """Inclui o score de mais uma geração e atualiza a superfície."""
+        self.count += 1
+        changed = None
+        if self.fills and self.fills[-1] < self.bucket_size:
+            self.mins[-1] = min(self.mins[-1], score)
+            self.maxs[-1] = max(self.maxs[-1], score)
+            self.fills[-1] += 1
+        else:
+            self.mins.append(score)
+            self.maxs.append(score)
+            self.fills.append(1)
+            if len(self.maxs) > self.max_points:
+                self._merge()
+                changed = 0
+        if score > self.scale:
+            self.scale = 2 ** math.ceil(math.log2(score))
+            changed = 0
+        self._draw_from(len(self.maxs) - 1 if changed is None else changed)
+
+    def _merge(self):
+        """Funde os baldes dois a dois e dobra o tamanho do balde."""
+        self.mins = [min(self.mins[i:i + 2]) for i in range(0, len(self.mins), 2)]
+        self.maxs = [max(self.maxs[i:i + 2]) for i in range(0, len(self.maxs), 2)]
+        self.fills = [sum(self.fills[i:i + 2]) for i in range(0, len(self.fills), 2)]
+        self.bucket_size *= 2
+
+    def _x(self, index):
+        return index * (self.width - 1) / (self.max_points - 1)
+
+    def _y(self, score):
+        return self.height - 1 - score / self.scale * (self.height - 1)
+
+    def _draw_from(self, first):
+        """Redesenha a partir do balde `first` (e o segmento que chega nele)."""
+        start = max(0, first - 1)
+        left = int(self._x(start))
+        self.surface.fill(self.colors.DARK_GRAY, (left, 0, self.width - left, self.height))
+
+        # Faixa mínimo-máximo de cada balde e a linha dos melhores scores
+        for i in range(start, len(self.maxs)):
+            x = self._x(i)
+            if self.mins[i] != self.maxs[i]:
+                pygame.draw.line(self.surface, self.colors.GRAY, (x, self._y(self.mins[i])), (x, self._y(self.maxs[i])))
+        points = [(self._x(i), self._y(self.maxs[i])) for i in range(start, len(self.maxs))]
+        if len(points) > 1:
+            pygame.draw.lines(self.surface, self.colors.PLAYER, False, points, 2)
@@ -0,0 +1,229 @@
+"""Exportação de replays para GIF ou sequência de PNGs, sem janela.
+
+Os frames são desenhados em uma `pygame.Surface` fora da tela, com os mesmos
+`_draw_pipes`, `Bird.draw` e `_draw_ground` da interface, e funcionam sem
+display (driver de vídeo `dummy` do SDL). Cada replay é dividido em blocos de
+frames distribuídos por um pool de processos: cada processo avança a física
+até o início do seu bloco sem desenhar, desenha o bloco e grava os PNGs ou
+codifica um pedaço do GIF. Os pedaços de GIF usam todos a mesma paleta fixa e
+são emendados na ordem pelo processo principal.
+
+Além de arquivos `.replay`, aceita uma IA salva (`best_flappy_brain.pkl`),
+que voa uma vez no percurso da semente `--course-seed` para gerar o replay.
+
+O GIF precisa do Pillow (`pip install Pillow`); a sequência de PNGs, não.
+
+Exemplos:
+    python export.py replays/geracao_00010.replay replays/geracao_00020.replay
+    python export.py --brain best_flappy_brain.pkl --course-seed 42 --format png --fps 60
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import time
+
+# Sem display: os frames são desenhados só em superfícies na memória
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from config import Config
+from flappy_bird_ai import Colors, FlappyBirdAI
+from neural_network import NeuralNetwork, PopulationBrain
+from replay import Replay, record_replay
+
+CHUNK_FRAMES = 120 # Frames desenhados por tarefa do pool
+
+# Instância headless (com a superfície fora da tela) criada uma vez por processo do pool
+_worker_game = None
+
+def _init_worker():
+    global _worker_game
+    pygame.font.init()
+    _worker_game = FlappyBirdAI(headless=True)
+    _worker_game.screen = pygame.Surface((_worker_game.config.GAME_WIDTH, _worker_game.config.GAME_HEIGHT))
+    _worker_game.fonts = {'medium': pygame.font.Font(None, 24)}
+
+def _palette():
+    """Paleta fixa dos quadros exportados: as cores da interface e uma rampa de cinzas para as bordas do texto."""
+    colors = [value for name, value in vars(Colors).items() if name.isupper()]
+    colors += [(level, level, level) for level in range(0, 256, 8)]
+    return colors + colors[-1:] * (256 - len(colors))
+
+def _render_frame(game, replay):
+    """Desenha a área do jogo do frame atual em `game.screen`."""
+    screen = game.screen
+    screen.fill(game.colors.SKY)
+    game._draw_pipes()
+    game._draw_birds()
+    game._draw_ground()
+    label = f"Score {game.replay_bird.score}" if replay.generation is None else f"Geração {replay.generation}  Score {game.replay_bird.score}"
+    text = game._render_text('medium', label, game.colors.WHITE)
+    screen.blit(text, (10, 10))
+
+def _render_chunk(replay, frames, first_index, options):
+    """Desenha os `frames` (números de frame, em ordem) de `replay`.
+
+    Com `format='png'`, grava um arquivo por frame, numerados a partir de
+    `first_index`, e retorna None; com `format='gif'`, retorna os bytes de um
+    GIF só com esses frames.
+    """
+    game = _worker_game
+    game.start_replay(replay)
+    scale = options['scale']
+    size = (round(game.screen.get_width() * scale), round(game.screen.get_height() * scale))
+    # O blit para uma superfície de 8 bits com a paleta fixa converte as cores bem mais rápido
+    # que quantizar quadros RGB no Pillow, e o PNG de 8 bits é gravado em um quinto do tempo
+    indexed = pygame.Surface(size, depth=8)
+    indexed.set_palette(_palette())
+    images = []
+    for index, frame in enumerate(frames, first_index):
+        # Só a física até o próximo frame pedido, sem desenhar
+        while game.frame_count < frame:
+            game.step()
+        _render_frame(game, replay)
+        indexed.blit(game.screen if scale == 1 else pygame.transform.smoothscale(game.screen, size), (0, 0))
+        if options['format'] == 'png':
+            pygame.image.save(indexed, os.path.join(options['path'], f"frame_{index:05d}.png"))
+        else:
+            images.append(pygame.image.tobytes(indexed, 'P'))
+    if options['format'] == 'png':
+        return None
+
+    from PIL import Image
+    palette = [channel for color in _palette() for channel in color]
+    pictures = []
+    for data in images:
+        picture = Image.frombytes('P', size, data)
+        picture.putpalette(palette)
+        pictures.append(picture)
+    out = io.BytesIO()
+    pictures[0].save(out, format='GIF', save_all=True, append_images=pictures[1:], duration=options['duration'],
+                     loop=0, optimize=False)
+    return out.getvalue()
+
+def _render_chunk_task(task):
+    return _render_chunk(*task)
+
+def _gif_header_size(data):
+    """Tamanho do cabeçalho de um GIF: assinatura, tela lógica, paleta global e extensões antes do primeiro frame."""
+    position = 13
+    packed = data[10]
+    if packed & 0x80:
+        position += 3 * 2 ** ((packed & 0x07) + 1)
+    # Extensões de aplicação e comentários (0x21 seguido do rótulo) até o controle gráfico do primeiro frame
+    while data[position] == 0x21 and data[position + 1] != 0xF9:
+        position += 2
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+    return position
+
+
+class ReplayExporter:
+    """Exporta replays para GIF ou PNGs, desenhando os frames em `workers` processos."""
+
+    def __init__(self, workers=None, output=Config.EXPORT_DIR, format='gif', fps=Config.EXPORT_FPS, scale=1.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.output = output
+        self.format = format
+        self.fps = fps
+        self.scale = scale
+        self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker)
+
+    @property
+    def stride(self):
+        """Frames do jogo entre dois quadros exportados."""
+        return max(1, round(Config.TARGET_FPS / self.fps))
+
+    def frames(self, replay):
+        """Números dos frames exportados: um a cada `stride` frames do jogo, mais o último."""
+        frames = list(range(self.stride, replay.frames + 1, self.stride))
+        if not frames or frames[-1] != replay.frames:
+            frames.append(replay.frames)
+        return frames
+
+    def export(self, replay, name):
+        """Exporta `replay` para `output/name.gif` (ou `output/name/frame_NNNNN.png`) e retorna o caminho."""
+        frames = self.frames(replay)
+        os.makedirs(self.output, exist_ok=True)
+        path = os.path.join(self.output, name if self.format == 'png' else f"{name}.gif")
+        if self.format == 'png':
+            os.makedirs(path, exist_ok=True)
+        options = {
+            'format': self.format,
+            'path': path,
+            'scale': self.scale,
+            'duration': round(1000 * self.stride / Config.TARGET_FPS),
+        }
+        tasks = [(replay, frames[start:start + CHUNK_FRAMES], start, options) for start in range(0, len(frames), CHUNK_FRAMES)]
+        chunks = self.pool.imap(_render_chunk_task, tasks)
+        if self.format == 'png':
+            for _ in chunks:
+                pass
+            return path
+
+        # Os pedaços chegam na ordem; do segundo em diante, só os frames entram no arquivo
+        with open(path, 'wb') as f:
+            for i, data in enumerate(chunks):
+                start = 0 if i == 0 else _gif_header_size(data)
+                end = len(data) - 1 if i < len(tasks) - 1 else len(data) # Sem o terminador (0x3B), menos no último
+                f.write(data[start:end])
+        return path
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def brain_replay(brain_file, course_seed, settings=None):
+    """Replay de uma IA salva (`NeuralNetwork`) voando no percurso `course_seed`."""
+    brain = NeuralNetwork.load(brain_file)
+    return record_replay(PopulationBrain.from_networks([brain]), course_seed, settings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta replays do Flappy Bird AI para GIF ou PNGs, sem janela.")
+    parser.add_argument('replays', nargs='*', help="Arquivos .replay a exportar")
+    parser.add_argument('--brain', default=None, help=f"IA salva a exportar (por exemplo, {Config.SAVE_FILE})")
+    parser.add_argument('--course-seed', type=int, default=0, help="Semente do percurso da IA de --brain (padrão: 0)")
+    parser.add_argument('--max-frames', type=int, default=Config.MAX_EPISODE_FRAMES,
+                        help=f"Limite de frames do voo da IA de --brain; 0 desativa (padrão: {Config.MAX_EPISODE_FRAMES})")
+    parser.add_argument('--format', choices=['gif', 'png'], default='gif', help="GIF animado ou sequência de PNGs (padrão: gif)")
+    parser.add_argument('--fps', type=int, default=Config.EXPORT_FPS,
+                        help=f"Quadros por segundo exportados, de até {Config.TARGET_FPS} (padrão: {Config.EXPORT_FPS})")
+    parser.add_argument('--scale', type=float, default=1.0, help="Escala dos quadros exportados (padrão: 1.0)")
+    parser.add_argument('--workers', type=int, default=None, help="Processos que desenham os quadros (padrão: um por CPU)")
+    parser.add_argument('--output', default=Config.EXPORT_DIR, help=f"Diretório de saída (padrão: {Config.EXPORT_DIR})")
+    args = parser.parse_args(argv)
+    if not args.replays and not args.brain:
+        parser.error("informe arquivos .replay e/ou --brain")
+    if not 1 <= args.fps <= Config.TARGET_FPS:
+        parser.error(f"--fps deve estar entre 1 e {Config.TARGET_FPS}")
+    if args.format == 'gif':
+        try:
+            import PIL # noqa: F401
+        except ImportError:
+            parser.error("o GIF precisa do Pillow (pip install Pillow); use --format png para exportar sem ele")
+
+    sources = [(Replay.load(path), os.path.splitext(os.path.basename(path))[0]) for path in args.replays]
+    if args.brain:
+        replay = brain_replay(args.brain, args.course_seed, {'MAX_EPISODE_FRAMES': args.max_frames or None})
+        sources.append((replay, f"{os.path.splitext(os.path.basename(args.brain))[0]}_percurso_{args.course_seed}"))
+
+    exporter = ReplayExporter(args.workers, args.output, args.format, args.fps, args.scale)
+    try:
+        for replay, name in sources:
+            start = time.perf_counter()
+            path = exporter.export(replay, name)
+            elapsed = time.perf_counter() - start
+            played = replay.frames / Config.TARGET_FPS
+            print(f"{path}: {len(exporter.frames(replay))} quadros, {played:.1f} s de jogo em {elapsed:.1f} s "
+                  f"({played / elapsed:.1f}x o tempo real)")
+    finally:
+        exporter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+class FitnessCache:
+    """Cache LRU do resultado (score e canos ultrapassados) de cada genoma em cada percurso.
+
+    A chave é (hash dos pesos, semente do percurso, configurações da
+    avaliação): como a simulação é determinística e cada pássaro é
+    independente dos outros, a mesma chave sempre produz o mesmo resultado.
+    No início de um episódio (`begin`), os pássaros já conhecidos são
+    encerrados com o resultado guardado, e as cópias idênticas dentro da
+    própria população (filhos que não sofreram mutação, pais sorteados várias
+    vezes) são simuladas uma vez só. Ao fim (`end`), os resultados novos
+    entram no cache.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = None # (população, chaves dos slots simulados) do episódio em andamento
+        self.hits = 0 # Pássaros que não precisaram ser simulados
+        self.misses = 0
+        self.skipped_frames = 0 # Frames de pássaro economizados pelos acertos do cache
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def genome_hashes(genomes):
+        """Hash de 16 bytes dos pesos de cada genoma de `genomes` (PopulationBrain)."""
+        flat = np.concatenate([genomes.weights_ih.reshape(len(genomes), -1),
+                               genomes.weights_ho.reshape(len(genomes), -1)], axis=1)
+        rows = np.ascontiguousarray(flat).view(np.dtype((np.void, flat.shape[1] * flat.itemsize))).ravel()
+        return [hashlib.blake2b(row, digest_size=16).digest() for row in rows.tolist()]
+
+    def begin(self, population, course_seeds, settings):
+        """Encerra na hora os pássaros de resultado conhecido ou repetido, antes do primeiro frame."""
+        settings_key = tuple(sorted(settings.items()))
+        genomes = len(population.genomes)
+        digests = self.genome_hashes(population.genomes)
+        # Primeiro genoma com os mesmos pesos de cada genoma; só os primeiros são consultados e simulados
+        _, first, inverse = np.unique(np.array(digests, dtype='S16'), return_index=True, return_inverse=True)
+        source = first[inverse.ravel()]
+        unique = np.flatnonzero(source == np.arange(genomes))
+        duplicates = np.flatnonzero(source != np.arange(genomes))
+
+        known, known_results = [], []
+        simulated = {} # Chave -> slot simulado
+        for course, seed in enumerate(course_seeds):
+            offset = course * genomes
+            keys = [(digests[genome], int(seed), settings_key) for genome in unique.tolist()]
+            results = list(map(self._entries.get, keys))
+            hits = [i for i, result in enumerate(results) if result is not None]
+            misses = [i for i, result in enumerate(results) if result is None]
+            for i in hits:
+                self._entries.move_to_end(keys[i])
+            known.extend((unique[hits] + offset).tolist())
+            known_results.extend(results[i] for i in hits)
+            simulated.update(zip([keys[i] for i in misses], (unique[misses] + offset).tolist()))
+
+        copies = (duplicates + np.arange(len(course_seeds))[:, np.newaxis] * genomes).ravel()
+        sources = (source[duplicates] + np.arange(len(course_seeds))[:, np.newaxis] * genomes).ravel()
+        self.hits += len(known) + len(copies)
+        self.misses += len(simulated)
+        if len(copies):
+            # As cópias recebem o resultado da origem quando o episódio termina
+            population.copies = (copies, sources)
+        if known:
+            scores, pipes_passed = np.array(known_results).T
+            self.skipped_frames += int(scores.sum())
+            population.finish(np.array(known), scores, pipes_passed)
+        if len(copies):
+            population.finish(copies, 0, 0)
+        self._pending = (population, simulated)
+
+    def end(self, population):
+        """Guarda os resultados do episódio de `population`, se ele começou com `begin` e já terminou."""
+        if self._pending is None or self._pending[0] is not population or population.alive_count:
+            return
+        _, simulated = self._pending
+        self._pending = None
+        if population.copies is not None:
+            _, sources = population.copies
+            self.skipped_frames += int(population.score[sources].sum())
+        slots = np.fromiter(simulated.values(), dtype=np.int64, count=len(simulated))
+        self._entries.update(zip(simulated, zip(population.score[slots].tolist(), population.pipes_passed[slots].tolist())))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._pending = None
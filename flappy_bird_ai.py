@@ -1,31 +1,30 @@
+import argparse
 import io
 import pygame
-import random
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from archive import GenomeArchive
 from bird import Bird
+from checkpoint import restore_checkpoint, save_checkpoint
+from collision import CollisionEngine
+from config import Config
+from course import CourseSet
+from evolution_graph import EvolutionGraph
+from fitness_cache import FitnessCache
 from neural_network import NeuralNetwork
-import matplotlib.pyplot as plt
+from population import Population
+from profiler import Profiler
+from pipes import PipeRing
+from replay import Replay, ReplayRecorder, record_replay
+from optimizers import OPTIMIZERS, create_optimizer
+from selection import SELECTION_STRATEGIES, compute_fitness, select_parents
+from text_cache import TextCache
 import numpy as np
 
 # --- Configurações e Constantes ---
 
-class Config:
-    """Agrupa todas as configurações do jogo e da IA."""
-    GAME_WIDTH = 400
-    GAME_HEIGHT = 600
-    UI_PANEL_WIDTH = 400
-    CANVAS_WIDTH = GAME_WIDTH + UI_PANEL_WIDTH
-    CANVAS_HEIGHT = GAME_HEIGHT + 100 # Inclui painel inferior
-
-    PIPE_WIDTH = 52
-    PIPE_GAP = 180
-    PIPE_SPAWN_RATE = 100 # A cada X frames
-    GROUND_HEIGHT = 20
-    
-    POPULATION_SIZE = 50
-    MUTATION_RATE = 0.05
-    SAVE_FILE = "best_flappy_brain.pkl"
-
 class Colors:
     """Define as cores usadas no jogo."""
     BACKGROUND = (26, 32, 44)
@@ -47,22 +46,53 @@ class GameState:
     TRAINING = 'training'
     PLAYING = 'playing'
     GAME_OVER = 'game_over'
+    REPLAY = 'replay'
 
 # --- Classe Principal do Jogo ---
 
+# Atributos de `Config` lidos pela simulação de um episódio, que alteram o resultado de uma avaliação
+EVALUATION_SETTINGS = ('GAME_WIDTH', 'GAME_HEIGHT', 'PIPE_WIDTH', 'PIPE_GAP', 'PIPE_SPAWN_RATE', 'GROUND_HEIGHT',
+                       'DECISION_INTERVAL', 'DECISION_MODE', 'MAX_EPISODE_FRAMES')
+
 class FlappyBirdAI:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, headless=False, seed=None):
         self.config = Config()
         self.colors = Colors()
+        self.headless = headless
+        self.seed = seed
+        self.screen = None
+        self.checkpoint_file = None # Se definido, recebe um checkpoint a cada CHECKPOINT_INTERVAL gerações
+        self.archive = None # GenomeArchive opcional que recebe os genomas de cada geração avaliada
+        self.replay_dir = None # Se definido, recebe o replay do melhor pássaro de cada geração (ver `replay.py`)
+        self.replay_recorder = None # ReplayRecorder do episódio de treino, ligado junto com `replay_dir`
+
+        if not headless:
+            pygame.init()
+            self.screen = pygame.display.set_mode((self.config.CANVAS_WIDTH, self.config.CANVAS_HEIGHT))
+            pygame.display.set_caption("Flappy Bird: Evolução de IA")
+            self._init_fonts()
         
-        self.screen = pygame.display.set_mode((self.config.CANVAS_WIDTH, self.config.CANVAS_HEIGHT))
-        pygame.display.set_caption("Flappy Bird: Evolução de IA")
-        
-        self._init_fonts()
         self._init_game_state()
         self._init_ui_rects()
-        self.evolution_graph_surface = None
+        self.collision = CollisionEngine(self.config, Population.X, Population.WIDTH, Population.HEIGHT)
+        self.evolution_graph = None # Criado no primeiro desenho do gráfico
+        # Resultados já simulados, para não simular de novo genomas repetidos no mesmo percurso
+        self.fitness_cache = FitnessCache(self.config.FITNESS_CACHE_SIZE) if self.config.FITNESS_CACHE_SIZE else None
+
+        # Cache de textos e controle do redesenho por regiões (ver `draw`)
+        self.text_cache = TextCache()
+        self._background = None
+        self._overlay_surface = None
+        self._redraw_all = True
+        self._drawn_state = None
+        self._region_signatures = {}
+
+        # Salvamentos (IA e gráfico) rodam em uma thread, sobre uma cópia dos dados
+        self._save_executor = None
+        self._pending_saves = []
+
+        # Cronômetros por fase (tecla O) e captura do cProfile (tecla C); desligados não custam nada
+        self.profiler = Profiler(type(self))
 
     def _init_fonts(self):
         """Inicializa as fontes usadas no jogo."""
@@ -77,15 +107,24 @@ class FlappyBirdAI:
     def _init_game_state(self):
         """Inicializa as variáveis de estado do jogo."""
         self.game_state = GameState.START
-        self.pipes = []
-        self.active_birds = []
-        self.saved_birds = []
+        self.pipes = PipeRing(self.config) # Canos vivos (um topo por percurso)
+        self.courses = None # Percursos de canos do episódio atual (um por linha da população)
+        self.fixed_course_seeds = None # Sementes repetidas em todas as gerações com FIXED_COURSES
+        self.population = None # Estado da população de treinamento (structure of arrays)
         self.player_bird = None
         self.ai_opponent = None
+        self.replay = None # Replay em reprodução, o pássaro que o reproduz e o último replay gravado
+        self.replay_bird = None
+        self.last_replay = None
+        self._paused_training = None # Estado do episódio de treino interrompido por um replay
         self.frame_count = 0
         self.generation = 1
         self.best_score = 0
         self.simulation_speed = 1
+        self.unlimited_speed = False # Quantos passos couberem no tempo livre de cada quadro
+        self.turbo = False # Como `unlimited_speed`, mas só desenha a cada TURBO_RENDER_GENERATIONS gerações
+        self.steps = 0 # Passos de simulação desde o início
+        self.steps_per_second = 0
         self.draw_all_birds = True
         self.clock = pygame.time.Clock()
         self.generation_scores = []
@@ -96,8 +135,17 @@ class FlappyBirdAI:
             'elitism': False,
             'adaptive_mutation': False,
         }
+        self.selection_strategy = 'roulette'
+        self.optimizer_name = 'ga' # Chave de OPTIMIZERS; 'ga' é o algoritmo genético abaixo
+        self.optimizer = None
         self.stagnation_count = 0
         self.previous_best_score = 0
+        
+        # Geradores independentes para o algoritmo genético e para os percursos,
+        # ambos derivados de `seed`: a mesma semente reproduz o treino inteiro
+        ga_seed, course_seed = np.random.SeedSequence(self.seed).spawn(2)
+        self.rng = np.random.default_rng(ga_seed)
+        self.course_rng = np.random.default_rng(course_seed)
 
     def _init_ui_rects(self):
         """Define as áreas retangulares da interface."""
@@ -118,6 +166,10 @@ class FlappyBirdAI:
             
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self._handle_mouse_click()
+            
+            # A janela foi descoberta ou restaurada: o conteúdo antigo não vale mais
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._redraw_all = True
         
         return True
 
@@ -133,10 +185,18 @@ class FlappyBirdAI:
             pygame.K_f: lambda: self._toggle_ga_enhancement('enhanced_fitness'),
             pygame.K_e: lambda: self._toggle_ga_enhancement('elitism'),
             pygame.K_a: lambda: self._toggle_ga_enhancement('adaptive_mutation'),
+            pygame.K_g: self._cycle_selection_strategy,
+            pygame.K_z: self._cycle_optimizer,
+            pygame.K_v: self._toggle_replay,
+            pygame.K_k: self._cycle_decision_interval,
+            pygame.K_h: self._toggle_decision_mode,
             pygame.K_1: lambda: self._change_speed(-1),
             pygame.K_2: lambda: self._change_speed(1),
-            pygame.K_UP: lambda: self._change_population(10),
-            pygame.K_DOWN: lambda: self._change_population(-10),
+            pygame.K_u: self._toggle_turbo,
+            pygame.K_o: self.profiler.toggle,
+            pygame.K_c: lambda: self.profiler.start_capture(self.config.PROFILE_CAPTURE_FRAMES),
+            pygame.K_UP: lambda: self._change_population(1),
+            pygame.K_DOWN: lambda: self._change_population(-1),
             pygame.K_RIGHT: lambda: self._change_mutation_rate(0.01),
             pygame.K_LEFT: lambda: self._change_mutation_rate(-0.01),
         }
@@ -152,6 +212,14 @@ class FlappyBirdAI:
         elif self.game_state == GameState.GAME_OVER:
             mode = GameState.PLAYING if self.ai_opponent else GameState.TRAINING
             self.switch_mode(mode)
+        elif self.game_state == GameState.REPLAY:
+            self.start_replay(self.replay)
+
+    def _toggle_replay(self):
+        if self.game_state == GameState.REPLAY:
+            self.stop_replay()
+        elif self.last_replay is not None and self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
+            self.start_replay(self.last_replay)
 
     def _toggle_draw_all_birds(self):
         if self.game_state == GameState.TRAINING:
@@ -161,12 +229,51 @@ class FlappyBirdAI:
         if self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
             self.ga_enhancements[enhancement] = not self.ga_enhancements[enhancement]
 
+    def _cycle_selection_strategy(self):
+        if self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
+            strategies = list(SELECTION_STRATEGIES)
+            self.selection_strategy = strategies[(strategies.index(self.selection_strategy) + 1) % len(strategies)]
+
+    def _cycle_optimizer(self):
+        if self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
+            names = list(OPTIMIZERS)
+            self.set_optimizer(names[(names.index(self.optimizer_name) + 1) % len(names)])
+
+    def set_optimizer(self, name):
+        """Troca o otimizador; o novo começa do zero, com a média no melhor genoma da geração atual."""
+        self.optimizer_name = name
+        self.optimizer = create_optimizer(name)
+
+    def _cycle_decision_interval(self):
+        intervals = self.config.DECISION_INTERVALS
+        current = self.config.DECISION_INTERVAL
+        self.config.DECISION_INTERVAL = intervals[(intervals.index(current) + 1) % len(intervals)] if current in intervals else intervals[0]
+
+    def _toggle_decision_mode(self):
+        self.config.DECISION_MODE = 'once' if self.config.DECISION_MODE == 'hold' else 'hold'
+
     def _change_speed(self, delta):
-        self.simulation_speed = max(1, min(10, self.simulation_speed + delta))
+        # Acima da velocidade máxima fixa vem a velocidade ilimitada (pelo tempo do quadro)
+        if self.unlimited_speed:
+            self.unlimited_speed = delta > 0
+            return
+        if delta > 0 and self.simulation_speed == self.config.MAX_SPEED:
+            self.unlimited_speed = True
+            return
+        self.simulation_speed = max(1, min(self.config.MAX_SPEED, self.simulation_speed + delta))
 
-    def _change_population(self, delta):
+    def _toggle_turbo(self):
+        if self.game_state == GameState.TRAINING:
+            self.turbo = not self.turbo
+
+    def _change_population(self, direction):
         if self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
-            self.config.POPULATION_SIZE = max(10, min(500, self.config.POPULATION_SIZE + delta))
+            # O passo acompanha a ordem de grandeza (10, 100, 1000...); ao diminuir,
+            # 1000 volta para 900 e não para 0
+            size = self.config.POPULATION_SIZE
+            magnitude = len(str(size - 1 if direction < 0 else size)) - 1
+            step = 10 ** max(1, magnitude)
+            self.config.POPULATION_SIZE = max(10, min(self.config.MAX_POPULATION_SIZE, size + direction * step))
 
     def _change_mutation_rate(self, delta):
         if self.game_state in [GameState.START, GameState.TRAINING, GameState.GAME_OVER]:
@@ -176,18 +283,17 @@ class FlappyBirdAI:
 
     def switch_mode(self, mode, force_restart=False):
         """Muda o estado do jogo e reinicia as entidades necessárias."""
-        self.pipes = []
-        self.frame_count = 0
         self.game_state = mode
 
         if mode == GameState.TRAINING:
-            if force_restart or not self.active_birds and not self.saved_birds:
+            if force_restart or self.population is None:
                 self.generation = 1
                 self.best_score = 0
-                self.active_birds = [Bird() for _ in range(self.config.POPULATION_SIZE)]
-                self.saved_birds = []
+                self.optimizer = create_optimizer(self.optimizer_name)
+                self.population = Population.random(self.config.POPULATION_SIZE, self.rng, self.config.EVALUATION_COURSES)
         elif mode == GameState.PLAYING:
             self._start_player_vs_ai_mode()
+        self._new_course()
 
     def _start_player_vs_ai_mode(self):
         """Configura o modo Jogador vs. IA."""
@@ -204,90 +310,121 @@ class FlappyBirdAI:
             print(f"Erro ao carregar IA salva: {e}")
             self.game_state = GameState.START
             return
-        self.active_birds = []
+        self.population = None
 
     # --- Lógica do Algoritmo Genético ---
 
     def next_generation(self):
         """Cria a próxima geração de pássaros."""
         self.generation += 1
-        self._calculate_fitness()
-        
-        self.saved_birds.sort(key=lambda b: b.fitness, reverse=True)
+        population = self.population
+        if self.fitness_cache is not None:
+            self.fitness_cache.end(population)
+        population.fitness = self._calculate_fitness()
         
         # Salva o melhor score da geração para o gráfico
-        if self.saved_birds:
-            best_score_in_gen = max(bird.score for bird in self.saved_birds)
-            self.generation_scores.append(best_score_in_gen)
+        self.generation_scores.append(int(population.score.max()))
+        
+        if self.archive is not None:
+            self._archive_generation(self.generation - 1, population.fitness)
+        if self.replay_dir:
+            self.save_best_replay(self.generation - 1)
+        
+        if self.optimizer is not None:
+            # Estratégia evolutiva: a geração seguinte é amostrada da distribuição atualizada
+            self.optimizer.tell(population.genomes, population.fitness)
+            brains = self.optimizer.ask(self.config.POPULATION_SIZE, self.rng)
+        else:
+            brains = self._breed(population)
         
-        self.active_birds = []
+        self.population = Population(brains, self.config.EVALUATION_COURSES)
+        self._new_course()
         
+        if self.checkpoint_file and self.generation % self.config.CHECKPOINT_INTERVAL == 0:
+            self.save_checkpoint()
+
+    def _breed(self, population):
+        """Genomas da próxima geração pelo algoritmo genético: elitismo, seleção e mutação."""
         # Elitismo
         elite_count = 0
         if self.ga_enhancements['elitism']:
-            elite_count = max(1, int(self.config.POPULATION_SIZE * 0.1))
-            for i in range(elite_count):
-                if i < len(self.saved_birds):
-                    self.active_birds.append(Bird(self.saved_birds[i].brain))
+            elite_count = min(max(1, int(self.config.POPULATION_SIZE * 0.1)), len(population.genomes))
+        elites = np.argsort(-population.fitness, kind='stable')[:elite_count]
         
-        # Crossover e Mutação
+        # Seleção e Mutação (os elites não sofrem mutação)
+        self._update_stagnation()
         current_mutation_rate = self._get_adaptive_mutation_rate()
-        for _ in range(self.config.POPULATION_SIZE - elite_count):
-            parent = self._pick_one()
-            child = Bird(parent.brain)
-            child.brain.mutate(current_mutation_rate)
-            self.active_birds.append(child)
-        
-        self.saved_birds = []
-        self.pipes = []
+        parents = self._select_parents(self.config.POPULATION_SIZE - elite_count)
+        brains = population.genomes.take(np.concatenate([elites, parents]))
+        brains.mutate(current_mutation_rate, self.rng, start=elite_count)
+        return brains
+
+    def _new_course(self, course_seeds=None):
+        """Começa um episódio em percursos novos (sorteados de `course_rng` se não informados).
+
+        É sorteado um percurso por linha de percursos da população. Com
+        FIXED_COURSES, os percursos são sorteados uma vez e repetidos em todas
+        as gerações, para que os genomas já avaliados venham do cache.
+        """
+        if course_seeds is None:
+            count = self.population.courses if self.population is not None else 1
+            if not self.config.FIXED_COURSES:
+                course_seeds = self.course_rng.integers(2**63, size=count)
+            else:
+                if self.fixed_course_seeds is None or len(self.fixed_course_seeds) != count:
+                    self.fixed_course_seeds = self.course_rng.integers(2**63, size=count)
+                course_seeds = self.fixed_course_seeds
+        self._reset_course(course_seeds)
+        if self.fitness_cache is not None and self.population is not None:
+            # Genomas já avaliados nestes percursos (ou repetidos na população) não são simulados
+            self.fitness_cache.begin(self.population, self.courses.seeds, self.evaluation_settings())
+        if self.replay_recorder is not None and self.population is not None:
+            self.replay_recorder.start(self.population)
+
+    def _reset_course(self, course_seeds):
+        """Volta os canos e o contador de frames ao início dos percursos `course_seeds`."""
+        self.courses = CourseSet(course_seeds, self.config)
+        self.pipes = PipeRing(self.config, len(self.courses), Population.X)
+        self.collision.set_pipes(self.pipes.x, self.pipes.top_heights)
         self.frame_count = 0
 
-    def _pick_one(self):
-        """Seleciona um pássaro da população salva com base no fitness (roleta)."""
-        index = 0
-        r = random.random()
-        while r > 0 and index < len(self.saved_birds):
-            r -= self.saved_birds[index].fitness
-            index += 1
-        index = max(0, min(index - 1, len(self.saved_birds) - 1))
-        return self.saved_birds[index]
+    def _select_parents(self, count):
+        """Sorteia de uma vez os índices dos pais com a estratégia de seleção ativa."""
+        return select_parents(self.selection_strategy, self.population.fitness, count, self.rng,
+                              tournament_size=self.config.TOURNAMENT_SIZE)
+
+    def _archive_generation(self, generation, fitness):
+        """Acrescenta a população atual (já avaliada) ao `archive` como a geração `generation`.
+
+        Se o arquivo já tem essa geração sem que o treino tenha sido retomado
+        dele (treino reiniciado com R ou diretório de outro treino), as gerações
+        novas vão para um arquivo novo, e as antigas ficam intactas.
+        """
+        if self.archive.last_generation >= generation:
+            previous, self.archive = self.archive.directory, self.archive.new_run()
+            print(f"'{previous}' já tem a geração {generation} de outro treino; as gerações deste vão para '{self.archive.directory}'",
+                  file=sys.stderr)
+        scores, _ = self.population.genome_scores()
+        self.archive.append(generation, self.population.genomes, fitness, scores)
+
+    def archive_last_generation(self):
+        """Arquiva a geração atual se ela já terminou; `next_generation` só arquiva a geração anterior."""
+        population = self.population
+        if self.archive is None or population is None or population.alive_count:
+            return
+        if self.fitness_cache is not None:
+            self.fitness_cache.end(population)
+        self._archive_generation(self.generation, self._calculate_fitness())
 
     def _calculate_fitness(self):
-        """Calcula o fitness de cada pássaro na população salva."""
-        if self.ga_enhancements['enhanced_fitness']:
-            self._calculate_enhanced_fitness()
-        else:
-            self._calculate_standard_fitness()
-
-    def _calculate_standard_fitness(self):
-        """Fitness baseado apenas no score."""
-        total_score = sum(bird.score ** 2 for bird in self.saved_birds)
-        if total_score == 0:
-            for bird in self.saved_birds:
-                bird.fitness = 1 / len(self.saved_birds)
-        else:
-            for bird in self.saved_birds:
-                bird.fitness = (bird.score ** 2) / total_score
-
-    def _calculate_enhanced_fitness(self):
-        """Fitness com bônus por canos passados."""
-        total_enhanced_score = 0
-        for bird in self.saved_birds:
-            enhanced_score = bird.score + (bird.pipes_passed * 100)
-            bird.enhanced_score = enhanced_score
-            total_enhanced_score += enhanced_score ** 2
-        
-        if total_enhanced_score == 0:
-            for bird in self.saved_birds:
-                bird.fitness = 1 / len(self.saved_birds)
-        else:
-            for bird in self.saved_birds:
-                bird.fitness = (bird.enhanced_score ** 2) / total_enhanced_score
+        """Calcula o fitness de cada genoma da população (array normalizado), pela média nos percursos."""
+        scores, pipes_passed = self.population.genome_scores()
+        return compute_fitness(scores, pipes_passed, self.ga_enhancements['enhanced_fitness'])
 
-    def _get_adaptive_mutation_rate(self):
-        """Ajusta a taxa de mutação com base na estagnação."""
+    def _update_stagnation(self):
+        """Conta as gerações seguidas sem melhora do melhor score."""
         if not self.ga_enhancements['adaptive_mutation']:
-            return self.config.MUTATION_RATE
+            return
         
         current_best = self.find_best_bird()
         current_best_score = current_best.score if current_best else 0
@@ -297,6 +434,11 @@ class FlappyBirdAI:
         else:
             self.stagnation_count = 0
             self.previous_best_score = current_best_score
+
+    def _get_adaptive_mutation_rate(self):
+        """Ajusta a taxa de mutação com base na estagnação."""
+        if not self.ga_enhancements['adaptive_mutation']:
+            return self.config.MUTATION_RATE
         
         if self.stagnation_count >= 3:
             return min(0.15, self.config.MUTATION_RATE * 2.0)
@@ -307,77 +449,239 @@ class FlappyBirdAI:
 
     def find_best_bird(self):
         """Encontra o melhor pássaro na população atual ou salva."""
-        population = self.active_birds or self.saved_birds
-        return max(population, key=lambda b: b.score) if population else None
+        if self.population is None:
+            return None
+        index = self.population.best_index()
+        return Bird.view(self.population, index) if index is not None else None
 
     def save_best_ai(self):
-        """Salva o cérebro do melhor pássaro e o gráfico de evolução."""
+        """Salva o cérebro do melhor pássaro e o gráfico de evolução em segundo plano.
+
+        Os dados são copiados na hora, então o treino continua enquanto o
+        arquivo e o gráfico são gravados.
+        """
         best_bird = self.find_best_bird()
-        if best_bird:
-            best_bird.brain.save(self.config.SAVE_FILE)
-            print(f"Melhor IA salva em '{self.config.SAVE_FILE}'!")
+        brain = best_bird.brain.copy() if best_bird else None
+        scores = list(self.generation_scores)
         
-        self.save_evolution_graph()
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='save')
+        self._pending_saves.append(self._save_executor.submit(self._save_snapshot, brain, scores))
 
-    def save_evolution_graph(self):
+    def _save_snapshot(self, brain, scores):
+        if brain is not None:
+            brain.save(self.config.SAVE_FILE)
+            print(f"Melhor IA salva em '{self.config.SAVE_FILE}'!")
+        
+        self.save_evolution_graph(scores)
+
+    @property
+    def saving(self):
+        """Indica se ainda há um salvamento em andamento (e relata os que falharam)."""
+        for future in [f for f in self._pending_saves if f.done()]:
+            self._pending_saves.remove(future)
+            if future.exception() is not None:
+                print(f"Erro ao salvar: {future.exception()}")
+        return bool(self._pending_saves)
+
+    def _wait_for_saves(self):
+        """Espera os salvamentos pendentes terminarem."""
+        if self._save_executor is not None:
+            self._save_executor.shutdown(wait=True)
+            self._save_executor = None
+        self.saving
+
+    def save_checkpoint(self, path=None):
+        """Grava o estado completo do treino (ver `checkpoint.py`)."""
+        save_checkpoint(self, path or self.checkpoint_file or self.config.CHECKPOINT_FILE)
+
+    def resume(self, path):
+        """Retoma o treino a partir de um checkpoint, no início da geração gravada.
+
+        As gerações do `archive` a partir da retomada são descartadas, pois
+        serão avaliadas de novo.
+        """
+        restore_checkpoint(self, path)
+        if self.archive is not None:
+            self.archive.rewind(self.generation)
+
+    def save_best_replay(self, generation=None):
+        """Grava em `replay_dir` o replay do melhor pássaro do episódio que acabou de terminar.
+
+        Se o episódio não foi gravado aqui (avaliado em outros processos, ou
+        o pássaro veio do cache de fitness), o melhor genoma é simulado de novo.
+        """
+        population = self.population
+        generation = self.generation if generation is None else generation
+        slot = population.best_index()
+        course_seed = self.courses.seeds[population.course[slot]]
+        replay = None
+        if self.replay_recorder is not None and self.replay_recorder.population is population:
+            replay = self.replay_recorder.replay(slot, course_seed, generation)
+        if replay is None:
+            genome = population.genomes.take([population.genome_index(slot)])
+            replay = record_replay(genome, course_seed, self.evaluation_settings(), generation)
+        self.last_replay = replay
+        os.makedirs(self.replay_dir, exist_ok=True)
+        replay.save(os.path.join(self.replay_dir, f"geracao_{generation:05d}.replay"))
+
+    def start_replay(self, replay):
+        """Reproduz `replay` só com a física; um episódio de treino em andamento fica pausado."""
+        if self.game_state == GameState.TRAINING:
+            self._paused_training = (self.courses, self.pipes, self.frame_count)
+        elif self.game_state != GameState.REPLAY:
+            self._paused_training = None
+        self.replay = replay
+        self.replay_bird = Bird(is_player=True)
+        self.game_state = GameState.REPLAY
+        self._reset_course([replay.course_seed])
+
+    def stop_replay(self):
+        """Sai do replay, voltando ao episódio de treino pausado (ou à tela inicial)."""
+        paused, self._paused_training = self._paused_training, None
+        self.replay = self.replay_bird = None
+        if paused is None:
+            self.game_state = GameState.START
+            return
+        self.courses, self.pipes, self.frame_count = paused
+        self.collision.set_pipes(self.pipes.x, self.pipes.top_heights)
+        self.game_state = GameState.TRAINING
+
+    @property
+    def replay_finished(self):
+        """Indica se o replay em reprodução chegou ao fim (sempre falso fora do replay)."""
+        if self.game_state != GameState.REPLAY:
+            return False
+        return self.replay_bird.lost or self.frame_count >= self.replay.frames
+
+    def save_evolution_graph(self, scores=None):
         """Gera e salva um gráfico de alta qualidade da evolução dos scores."""
-        if not self.generation_scores or len(self.generation_scores) < 2:
+        scores = self.generation_scores if scores is None else scores
+        if not scores or len(scores) < 2:
             print("Dados insuficientes para gerar o gráfico de evolução.")
             return
 
-        plt.figure(figsize=(12, 6))
+        # O matplotlib só é carregado aqui; a `Figure` direta (sem pyplot) pode ser usada fora da thread principal
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(12, 6))
+        ax = figure.subplots()
         
-        generations = range(1, len(self.generation_scores) + 1)
-        scores = self.generation_scores
+        generations = range(1, len(scores) + 1)
         
-        plt.plot(generations, scores, marker='o', linestyle='-', label='Melhor Score da Geração')
+        ax.plot(generations, scores, marker='o', linestyle='-', label='Melhor Score da Geração')
         
         # Linha de tendência
         x = np.array(generations)
         y = np.array(scores)
         z = np.polyfit(x, y, 1)
         p = np.poly1d(z)
-        plt.plot(x, p(x), "r--", label=f'Linha de Tendência (y={z[0]:.2f}x + {z[1]:.2f})')
-
-        plt.title('Evolução do Score Máximo por Geração')
-        plt.xlabel('Geração')
-        plt.ylabel('Score Máximo')
-        plt.grid(True, which='both', linestyle='--', linewidth=0.5)
-        plt.legend()
-        plt.tight_layout()
+        ax.plot(x, p(x), "r--", label=f'Linha de Tendência (y={z[0]:.2f}x + {z[1]:.2f})')
+
+        ax.set_title('Evolução do Score Máximo por Geração')
+        ax.set_xlabel('Geração')
+        ax.set_ylabel('Score Máximo')
+        ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+        ax.legend()
+        figure.tight_layout()
         
         filename = "evolucao_scores.png"
-        plt.savefig(filename)
+        figure.savefig(filename)
         print(f"Gráfico de evolução salvo como '{filename}'")
-        plt.close()
 
     # --- Lógica de Atualização do Jogo ---
 
-    def update(self):
-        """Atualiza o estado do jogo a cada frame."""
+    def update(self, budget=None):
+        """Atualiza o estado do jogo a cada frame.
+
+        Nas velocidades fixas, roda `simulation_speed` passos. Na velocidade
+        ilimitada (no treino e no replay) e no turbo (só no treino), roda
+        quantos passos couberem em `budget` segundos.
+        """
+        state = self.game_state
+        if (state == GameState.TRAINING and (self.unlimited_speed or self.turbo)) or (state == GameState.REPLAY and self.unlimited_speed):
+            deadline = time.perf_counter() + (budget if budget is not None else 1 / self.config.TARGET_FPS)
+            self.step()
+            while time.perf_counter() < deadline and self.game_state == state and not self.replay_finished:
+                self.step()
+            return
         for _ in range(self.simulation_speed):
-            self.frame_count += 1
-            self._update_pipes()
-            
-            if self.game_state == GameState.TRAINING:
-                self._update_training_mode()
-            elif self.game_state == GameState.PLAYING:
-                self._update_playing_mode()
+            self.step()
+
+    def step(self):
+        """Avança a simulação em exatamente um frame, sem desenhar nada."""
+        if self.replay_finished:
+            return
+        self.steps += 1
+        self.frame_count += 1
+        self._update_pipes()
+        
+        if self.game_state == GameState.TRAINING:
+            self._update_training_mode()
+        elif self.game_state == GameState.PLAYING:
+            self._update_playing_mode()
+        elif self.game_state == GameState.REPLAY:
+            self._update_replay_mode()
 
     def _update_training_mode(self):
         """Atualiza a lógica para o modo de treinamento."""
-        if not self.active_birds:
+        if not self.population.alive_count:
+            # A nova geração começa no próximo frame, como a primeira
             self.next_generation()
+            return
+        self._step_population()
+
+    def _step_population(self):
+        """Avança um frame de todos os pássaros vivos da população de treinamento."""
+        population = self.population
         
-        for i in range(len(self.active_birds) - 1, -1, -1):
-            bird = self.active_birds[i]
-            bird.think(self.pipes, self.config.GAME_HEIGHT, self.config.GAME_WIDTH)
-            bird.update()
-            
-            if self._check_collision(bird):
-                self.saved_birds.append(self.active_birds.pop(i))
-            else:
-                self._check_pipe_pass(bird)
+        # Uma única passada da rede (nos frames de decisão) e um passo de física para todos os pássaros vivos
+        flapped = True
+        if self._is_decision_frame():
+            inputs = population.get_inputs(self.pipes.features, self.config.GAME_HEIGHT)
+            population.think(inputs)
+        elif self.config.DECISION_MODE == 'hold':
+            population.repeat_action()
+        else:
+            flapped = False
+        if self.replay_recorder is not None:
+            self.replay_recorder.record(population, population.flapping[population.slots] if flapped else None)
+        population.update()
+        population.kill(self._check_population_collision())
+        self._check_pipe_pass()
+        
+        # Com o limite de frames, os sobreviventes param juntos e a geração termina
+        max_frames = self.config.MAX_EPISODE_FRAMES
+        if max_frames and self.frame_count >= max_frames:
+            population.kill(np.ones(population.alive_count, dtype=bool))
+
+    def _is_decision_frame(self):
+        """Indica se a rede deve ser consultada neste frame (o primeiro de cada episódio sempre é)."""
+        return (self.frame_count - 1) % self.config.DECISION_INTERVAL == 0
+
+    def evaluation_settings(self):
+        """Configurações que alteram o resultado de uma avaliação, para repassar a outros processos.
+
+        São também parte da chave do cache de fitness.
+        """
+        return {name: getattr(self.config, name) for name in EVALUATION_SETTINGS}
+
+    def run_episode(self, population, course_seeds):
+        """Simula `population` até todos morrerem, sem desenhar e sem evoluir.
+
+        É o mesmo passo de `_update_training_mode`, nos percursos de canos
+        gerados a partir de `course_seeds` (um por linha de percursos da
+        população), para que avaliações em processos diferentes vejam
+        exatamente os mesmos canos.
+        """
+        self.population = population
+        self._new_course(course_seeds)
+        while population.alive_count:
+            self.frame_count += 1
+            self._update_pipes()
+            self._step_population()
+        if self.fitness_cache is not None:
+            self.fitness_cache.end(population)
+        return population
 
     def _update_playing_mode(self):
         """Atualiza a lógica para o modo jogador vs. IA."""
@@ -387,7 +691,10 @@ class FlappyBirdAI:
                 self.player_bird.lost = True
         
         if not self.ai_opponent.lost:
-            self.ai_opponent.think(self.pipes, self.config.GAME_HEIGHT, self.config.GAME_WIDTH)
+            if self._is_decision_frame():
+                self.ai_opponent.think(self.pipes.features[0], self.config.GAME_HEIGHT)
+            elif self.config.DECISION_MODE == 'hold' and self.ai_opponent.flapping:
+                self.ai_opponent.flap()
             self.ai_opponent.update()
             if self._check_collision(self.ai_opponent):
                 self.ai_opponent.lost = True
@@ -395,55 +702,114 @@ class FlappyBirdAI:
         if self.player_bird.lost and self.ai_opponent.lost:
             self.game_state = GameState.GAME_OVER
 
+    def _update_replay_mode(self):
+        """Avança o pássaro do replay: o pulo vem da gravação, e não da rede."""
+        bird = self.replay_bird
+        if self.replay.flaps[self.frame_count - 1]:
+            bird.flap()
+        bird.update()
+        if self._check_collision(bird):
+            bird.lost = True
+        else:
+            bird.pipes_passed += self.pipes.count_passed()
+
     def _update_pipes(self):
         """Move e cria novos canos."""
         if self.frame_count % self.config.PIPE_SPAWN_RATE == 0:
-            top_height = random.randint(50, self.config.GAME_HEIGHT - self.config.PIPE_GAP - 100)
-            self.pipes.append({'x': self.config.GAME_WIDTH, 'top_height': top_height, 'birds_passed': set()})
-        
-        for pipe in self.pipes:
-            pipe['x'] -= 2
-        
-        self.pipes = [p for p in self.pipes if p['x'] + self.config.PIPE_WIDTH > 0]
+            self.pipes.spawn(self.courses.top_heights(self.pipes.count))
+        self.pipes.advance()
 
     def _check_collision(self, bird):
-        """Verifica se um pássaro colidiu com o chão, teto ou canos."""
-        if bird.is_offscreen(self.config.GAME_HEIGHT, self.config.GROUND_HEIGHT):
-            return True
-        for pipe in self.pipes:
-            if bird.collides_with(pipe, self.config.PIPE_GAP):
-                return True
-        return False
-
-    def _check_pipe_pass(self, bird):
-        """Verifica se um pássaro passou por um cano para o fitness aprimorado."""
-        for pipe in self.pipes:
-            bird_id = id(bird)
-            if pipe['x'] + self.config.PIPE_WIDTH < bird.x and bird_id not in pipe['birds_passed']:
-                bird.pipes_passed += 1
-                pipe['birds_passed'].add(bird_id)
+        """Verifica se um pássaro (do primeiro percurso) colidiu com o chão, teto ou canos."""
+        return bool(self.collision.death_mask(np.array([bird.y]))[0])
+
+    def _check_population_collision(self):
+        """Retorna a máscara de morte dos pássaros vivos da população de treinamento."""
+        population = self.population
+        return self.collision.death_mask(population.y[population.slots], population.alive_courses())
+
+    def _check_pipe_pass(self):
+        """Conta os canos ultrapassados pelos pássaros vivos para o fitness aprimorado."""
+        passed = self.pipes.count_passed()
+        if passed:
+            self.population.add_pipe_passed(passed)
 
     # --- Lógica de Desenho ---
 
     def draw(self):
-        """Desenha todos os elementos na tela."""
-        self.screen.fill(self.colors.BACKGROUND)
+        """Desenha o frame atual, atualizando na tela só as regiões que mudaram."""
+        if self._background is None:
+            self._background = self._render_background()
+        if self.game_state != self._drawn_state:
+            self._redraw_all = True
+        if self._redraw_all:
+            self.screen.blit(self._background, (0, 0))
+            self._region_signatures = {}
+            self._drawn_state = self.game_state
+
+        dirty = []
+        if self._region_changed('game', (self.game_state, self.generation, self.frame_count, self.draw_all_birds)):
+            self._draw_game_area()
+            dirty.append(self.game_rect)
+        dirty.extend(self._draw_ui_panel())
+
+        if self._redraw_all:
+            dirty = [self.screen.get_rect()]
+            self._redraw_all = False
+        if dirty:
+            pygame.display.update(dirty)
+
+    def _region_changed(self, region, signature):
+        """Indica se o conteúdo de `region` mudou desde o último desenho (e guarda a nova assinatura)."""
+        if self._region_signatures.get(region) == signature:
+            return False
+        self._region_signatures[region] = signature
+        return True
+
+    def _render_text(self, font, text, color):
+        return self.text_cache.render(self.fonts[font], text, color)
+
+    def _render_background(self):
+        """Desenha uma vez o fundo fixo da tela: painéis, divisórias e título."""
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(self.colors.BACKGROUND)
+        
+        # Painel lateral
+        pygame.draw.rect(background, self.colors.DARK_GRAY, self.ui_panel_rect)
+        pygame.draw.line(background, self.colors.WHITE, (self.config.GAME_WIDTH, 0), (self.config.GAME_WIDTH, self.config.CANVAS_HEIGHT), 2)
+        title_text = self._render_text('medium', "FLAPPY BIRD AI", self.colors.WHITE)
+        background.blit(title_text, (self.config.GAME_WIDTH + 10, 10))
+        
+        # Painel inferior
+        pygame.draw.rect(background, self.colors.DARK_GRAY, self.bottom_panel_rect)
+        pygame.draw.line(background, self.colors.WHITE, (0, self.config.GAME_HEIGHT), (self.config.GAME_WIDTH, self.config.GAME_HEIGHT), 2)
+        return background
+
+    def _restore_background(self, rect):
+        """Apaga `rect` da tela copiando o fundo fixo por cima."""
+        self.screen.blit(self._background, rect, rect)
+
+    def _draw_game_area(self):
+        """Desenha a área do jogo: céu, canos, pássaros, chão e overlays."""
+        # Os canos nascem na borda direita; o recorte impede que invadam o painel, que não é redesenhado todo frame
+        self.screen.set_clip(self.game_rect)
         pygame.draw.rect(self.screen, self.colors.SKY, self.game_rect)
 
         self._draw_pipes()
         self._draw_birds()
         self._draw_ground()
-        
-        self._draw_ui_panel()
         self._draw_game_overlays()
         
         pygame.draw.rect(self.screen, self.colors.WHITE, self.game_rect, 2)
-        pygame.display.flip()
+        self.screen.set_clip(None)
 
     def _draw_pipes(self):
-        for pipe in self.pipes:
-            pygame.draw.rect(self.screen, self.colors.PIPE, (pipe['x'], 0, self.config.PIPE_WIDTH, pipe['top_height']))
-            pygame.draw.rect(self.screen, self.colors.PIPE, (pipe['x'], pipe['top_height'] + self.config.PIPE_GAP, self.config.PIPE_WIDTH, self.config.GAME_HEIGHT - pipe['top_height'] - self.config.PIPE_GAP))
+        # Só o primeiro percurso é desenhado
+        pipes = self.pipes
+        for slot in pipes.live_slots():
+            x, top_height = pipes.x[slot], pipes.top_heights[0, slot]
+            pygame.draw.rect(self.screen, self.colors.PIPE, (x, 0, self.config.PIPE_WIDTH, top_height))
+            pygame.draw.rect(self.screen, self.colors.PIPE, (x, top_height + self.config.PIPE_GAP, self.config.PIPE_WIDTH, self.config.GAME_HEIGHT - top_height - self.config.PIPE_GAP))
 
     def _draw_ground(self):
         pygame.draw.rect(self.screen, self.colors.GROUND, (0, self.config.GAME_HEIGHT - self.config.GROUND_HEIGHT, self.config.GAME_WIDTH, self.config.GROUND_HEIGHT))
@@ -451,46 +817,66 @@ class FlappyBirdAI:
     def _draw_birds(self):
         """Desenha os pássaros na tela."""
         if self.game_state == GameState.TRAINING:
-            best_bird = self.find_best_bird()
-            birds_to_draw = self.active_birds if self.draw_all_birds else ([best_bird] if best_bird else [])
-            for bird in birds_to_draw:
-                is_best = bird == best_bird
-                color = self.colors.PLAYER if is_best else self.colors.AI
-                alpha = 255 if is_best else 100
-                
-                bird_surface = pygame.Surface((bird.width, bird.height), pygame.SRCALPHA)
-                bird_surface.fill((*color, alpha))
-                self.screen.blit(bird_surface, (bird.x, bird.y))
-                
-                if is_best:
-                    text = self.fonts['tiny'].render("BEST", True, self.colors.BLACK)
-                    text_rect = text.get_rect(center=(bird.x + bird.width // 2, bird.y + bird.height // 2))
-                    self.screen.blit(text, text_rect)
+            # Só os pássaros do primeiro percurso, que é o desenhado
+            population = self.population
+            if self.draw_all_birds:
+                # Uma única superfície translúcida reaproveitada por todos os pássaros vivos
+                bird_surface = pygame.Surface((population.WIDTH, population.HEIGHT), pygame.SRCALPHA)
+                bird_surface.fill((*self.colors.AI, 100))
+                slots = population.slots[population.course[population.slots] == 0]
+                self.screen.blits([(bird_surface, (population.X, y)) for y in population.y[slots]], doreturn=False)
+            
+            best_index = population.best_index(course=0)
+            best_bird = Bird.view(population, best_index) if best_index is not None else None
+            if best_bird:
+                pygame.draw.rect(self.screen, self.colors.PLAYER, (best_bird.x, best_bird.y, best_bird.width, best_bird.height))
+                text = self._render_text('tiny', "BEST", self.colors.BLACK)
+                text_rect = text.get_rect(center=(best_bird.x + best_bird.width // 2, best_bird.y + best_bird.height // 2))
+                self.screen.blit(text, text_rect)
         
+        elif self.game_state == GameState.REPLAY:
+            self.replay_bird.draw(self.screen, self.colors.PLAYER, "BEST")
+
         elif self.game_state in [GameState.PLAYING, GameState.GAME_OVER]:
             if self.player_bird: self.player_bird.draw(self.screen, self.colors.PLAYER, "JOGADOR")
             if self.ai_opponent: self.ai_opponent.draw(self.screen, self.colors.AI, "IA")
 
     def _draw_ui_panel(self):
-        """Desenha os painéis de UI lateral e inferior."""
-        # Painel lateral
-        pygame.draw.rect(self.screen, self.colors.DARK_GRAY, self.ui_panel_rect)
-        pygame.draw.line(self.screen, self.colors.WHITE, (self.config.GAME_WIDTH, 0), (self.config.GAME_WIDTH, self.config.CANVAS_HEIGHT), 2)
+        """Redesenha as partes dos painéis lateral e inferior que mudaram; retorna as áreas alteradas."""
+        dirty = []
+        panel_x = self.config.GAME_WIDTH
         
-        title_text = self.fonts['medium'].render("FLAPPY BIRD AI", True, self.colors.WHITE)
-        self.screen.blit(title_text, (self.config.GAME_WIDTH + 10, 10))
-        
-        stats_y_end = self._draw_stats_on_panel()
-
-        # Desenha o gráfico de evolução se ele existir
-        if self.game_state == GameState.TRAINING:
-            self._draw_evolution_graph(stats_y_end + 20)
+        # Estatísticas do painel lateral
+        stats = self._get_stats()
+        stats_y_end = self._stats_end(stats)
+        if self._region_changed('stats', tuple(stats)):
+            stats_rect = pygame.Rect(panel_x, 40, self.config.UI_PANEL_WIDTH, stats_y_end - 42)
+            self._restore_background(stats_rect)
+            self._draw_stats_on_panel(stats)
+            dirty.append(stats_rect)
+
+        # O gráfico de evolução só muda quando uma geração termina
+        scores = self.generation_scores
+        graph_signature = (self.game_state, stats_y_end, len(scores), scores[-1] if scores else None, self.profiler.summary)
+        if self._region_changed('graph', graph_signature):
+            graph_area = pygame.Rect(panel_x, stats_y_end, self.config.UI_PANEL_WIDTH, self.config.CANVAS_HEIGHT - stats_y_end)
+            self._restore_background(graph_area)
+            if self.profiler.enabled:
+                # Os tempos por fase ocupam o lugar do gráfico enquanto o perfil está ligado
+                self._draw_profiler_overlay(stats_y_end + 20)
+            elif self.game_state == GameState.TRAINING:
+                self._draw_evolution_graph(stats_y_end + 20)
+            dirty.append(graph_area)
 
         # Painel inferior
-        pygame.draw.rect(self.screen, self.colors.DARK_GRAY, self.bottom_panel_rect)
-        pygame.draw.line(self.screen, self.colors.WHITE, (0, self.config.GAME_HEIGHT), (self.config.GAME_WIDTH, self.config.GAME_HEIGHT), 2)
-        
-        self._draw_bottom_panel_info()
+        progress = self._get_progress()
+        bottom_signature = (self.game_state, None if progress is None else (int(progress * 100), int(progress * 200)))
+        if self._region_changed('bottom', bottom_signature):
+            bottom_rect = self.bottom_panel_rect.inflate(0, -4).move(0, 2)
+            self._restore_background(bottom_rect)
+            self._draw_bottom_panel_info()
+            dirty.append(bottom_rect)
+        return dirty
 
     def _draw_evolution_graph(self, start_y):
         """Desenha o gráfico de evolução dos scores usando Pygame."""
@@ -503,80 +889,106 @@ class FlappyBirdAI:
         graph_rect = pygame.Rect(graph_x, graph_y, graph_width, graph_height)
         pygame.draw.rect(self.screen, self.colors.GRAY, graph_rect, 1)
         
-        title = self.fonts['small'].render("Evolução dos Scores", True, self.colors.WHITE)
+        title = self._render_text('small', "Evolução dos Scores", self.colors.WHITE)
         title_rect = title.get_rect(center=(graph_rect.centerx, graph_y - 15))
         self.screen.blit(title, title_rect)
 
         if len(self.generation_scores) < 2:
             return
 
-        max_score = max(self.generation_scores) if self.generation_scores else 1
-        points = []
-        for i, score in enumerate(self.generation_scores):
-            x = graph_x + (i / (len(self.generation_scores) - 1)) * graph_width
-            y = graph_y + graph_height - (score / max_score) * graph_height
-            points.append((x, y))
-
-        if len(points) > 1:
-            pygame.draw.lines(self.screen, self.colors.PLAYER, False, points, 2)
+        # A superfície do gráfico só recebe as gerações novas (ver `EvolutionGraph`)
+        if self.evolution_graph is None:
+            self.evolution_graph = EvolutionGraph(graph_width - 2, graph_height - 2, self.colors)
+        self.evolution_graph.sync(self.generation_scores)
+        self.screen.blit(self.evolution_graph.surface, (graph_x + 1, graph_y + 1))
+
+    def _draw_profiler_overlay(self, start_y):
+        """Desenha a fração do tempo e o custo por chamada de cada fase (ver `Profiler`)."""
+        x = self.config.GAME_WIDTH + 20
+        title = self._render_text('small', "Perfil por Fase (O) - % do tempo, ms/chamada", self.colors.WHITE)
+        self.screen.blit(title, (x, start_y - 20))
+        if not self.profiler.summary:
+            self.screen.blit(self._render_text('tiny', "Medindo...", self.colors.GRAY), (x, start_y))
+            return
         
-        for p in points:
-            pygame.draw.circle(self.screen, self.colors.WHITE, p, 3)
-
-    def _draw_stats_on_panel(self):
-        """Desenha as estatísticas e controles no painel lateral."""
-        stats_y = 50
+        rows = (self.config.CANVAS_HEIGHT - start_y) // 15
+        for i, (phase, share, per_call) in enumerate(self.profiler.summary[:rows]):
+            y = start_y + i * 15
+            self.screen.blit(self._render_text('tiny', phase, self.colors.WHITE), (x, y))
+            self.screen.blit(self._render_text('tiny', f"{share:5.1f}%", self.colors.PLAYER), (x + 180, y))
+            self.screen.blit(self._render_text('tiny', f"{per_call:.3f} ms", self.colors.WHITE), (x + 250, y))
+
+    def _get_stats(self):
+        """Linhas (texto, cor) do painel lateral para o estado atual."""
         stats_map = {
             GameState.TRAINING: self._get_training_stats,
             GameState.PLAYING: self._get_playing_stats,
             GameState.START: self._get_start_stats,
             GameState.GAME_OVER: self._get_start_stats,
+            GameState.REPLAY: self._get_replay_stats,
         }
-        stats = stats_map[self.game_state]()
-        
-        last_y = stats_y
+        return stats_map[self.game_state]()
+
+    def _stats_end(self, stats, stats_y=50):
+        """Posição Y logo abaixo da última linha de estatísticas, onde começa o gráfico."""
+        filled = [i for i, (stat, _) in enumerate(stats) if stat]
+        return stats_y + (filled[-1] * 20 if filled else 0) + 20
+
+    def _draw_stats_on_panel(self, stats, stats_y=50):
+        """Desenha as estatísticas e controles no painel lateral."""
         for i, (stat, color) in enumerate(stats):
             if stat:
-                text = self.fonts['small'].render(stat, True, color)
+                text = self._render_text('small', stat, color)
                 self.screen.blit(text, (self.config.GAME_WIDTH + 10, stats_y + i * 20))
-                last_y = stats_y + i * 20
-        
-        return last_y + 20 # Retorna a posição Y final para posicionar o gráfico abaixo
 
     def _draw_bottom_panel_info(self):
         """Desenha as informações no painel inferior."""
         if self.game_state == GameState.TRAINING:
-            mode_text = self.fonts['medium'].render("MODO: TREINAMENTO", True, self.colors.GREEN)
-            info_text = self.fonts['small'].render("IA evoluindo...", True, self.colors.WHITE)
+            mode_text = self._render_text('medium', "MODO: TREINAMENTO", self.colors.GREEN)
+            info_text = self._render_text('small', "IA evoluindo...", self.colors.WHITE)
             self.screen.blit(mode_text, (10, self.config.GAME_HEIGHT + 10))
             self.screen.blit(info_text, (10, self.config.GAME_HEIGHT + 40))
             self._draw_progress_bar()
         elif self.game_state == GameState.PLAYING:
-            mode_text = self.fonts['medium'].render("MODO: JOGADOR vs IA", True, self.colors.PLAYER)
-            info_text = self.fonts['small'].render("Use ESPAÇO para voar!", True, self.colors.WHITE)
+            mode_text = self._render_text('medium', "MODO: JOGADOR vs IA", self.colors.PLAYER)
+            info_text = self._render_text('small', "Use ESPAÇO para voar!", self.colors.WHITE)
+            self.screen.blit(mode_text, (10, self.config.GAME_HEIGHT + 10))
+            self.screen.blit(info_text, (10, self.config.GAME_HEIGHT + 40))
+        elif self.game_state == GameState.REPLAY:
+            mode_text = self._render_text('medium', "MODO: REPLAY", self.colors.PLAYER)
+            info_text = self._render_text('small', f"Melhor pássaro da geração {self.replay.generation}", self.colors.WHITE)
             self.screen.blit(mode_text, (10, self.config.GAME_HEIGHT + 10))
             self.screen.blit(info_text, (10, self.config.GAME_HEIGHT + 40))
+            self._draw_progress_bar()
         elif self.game_state == GameState.GAME_OVER:
-            mode_text = self.fonts['medium'].render("JOGO FINALIZADO", True, self.colors.RED)
-            info_text = self.fonts['small'].render("Pressione ESPAÇO para jogar novamente", True, self.colors.WHITE)
+            mode_text = self._render_text('medium', "JOGO FINALIZADO", self.colors.RED)
+            info_text = self._render_text('small', "Pressione ESPAÇO para jogar novamente", self.colors.WHITE)
             self.screen.blit(mode_text, (10, self.config.GAME_HEIGHT + 10))
             self.screen.blit(info_text, (10, self.config.GAME_HEIGHT + 40))
         else: # Start
-            mode_text = self.fonts['medium'].render("FLAPPY BIRD - EVOLUÇÃO", True, self.colors.WHITE)
-            info_text = self.fonts['small'].render("Pressione T para treinar ou P para jogar", True, self.colors.WHITE)
+            mode_text = self._render_text('medium', "FLAPPY BIRD - EVOLUÇÃO", self.colors.WHITE)
+            info_text = self._render_text('small', "Pressione T para treinar ou P para jogar", self.colors.WHITE)
             self.screen.blit(mode_text, (10, self.config.GAME_HEIGHT + 10))
             self.screen.blit(info_text, (10, self.config.GAME_HEIGHT + 40))
 
+    def _get_progress(self):
+        """Fração da população de treinamento já eliminada (ou dos frames do replay), ou None nos outros modos."""
+        if self.game_state == GameState.TRAINING and self.population is not None and self.population.alive_count:
+            return (len(self.population) - self.population.alive_count) / len(self.population)
+        if self.game_state == GameState.REPLAY and self.replay.frames:
+            return min(1.0, self.frame_count / self.replay.frames)
+        return None
+
     def _draw_progress_bar(self):
         """Desenha a barra de progresso da geração."""
-        if self.active_birds:
-            progress = (self.config.POPULATION_SIZE - len(self.active_birds)) / self.config.POPULATION_SIZE
+        progress = self._get_progress()
+        if progress is not None:
             bar_width, bar_height, bar_x, bar_y = 200, 10, 10, self.config.GAME_HEIGHT + 70
             
             pygame.draw.rect(self.screen, self.colors.GRAY, (bar_x, bar_y, bar_width, bar_height))
             pygame.draw.rect(self.screen, self.colors.GREEN, (bar_x, bar_y, bar_width * progress, bar_height))
             
-            progress_text = self.fonts['tiny'].render(f"Progresso: {int(progress * 100)}%", True, self.colors.WHITE)
+            progress_text = self._render_text('tiny', f"Progresso: {int(progress * 100)}%", self.colors.WHITE)
             self.screen.blit(progress_text, (bar_x + bar_width + 10, bar_y - 2))
 
     def _draw_game_overlays(self):
@@ -591,16 +1003,19 @@ class FlappyBirdAI:
             else:
                 winner, color = "EMPATE!", self.colors.WHITE
             self._draw_overlay_message(winner, "ESPAÇO para jogar novamente", color=color)
+        elif self.replay_finished:
+            self._draw_overlay_message("REPLAY CONCLUÍDO", "ESPAÇO para rever", "V para sair")
 
     def _draw_overlay_message(self, line1, line2, line3=None, color=None):
         """Função auxiliar para desenhar mensagens de overlay."""
         color = color or self.colors.WHITE
-        overlay = pygame.Surface((self.config.GAME_WIDTH, self.config.GAME_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        self.screen.blit(overlay, (0, 0))
+        if self._overlay_surface is None:
+            self._overlay_surface = pygame.Surface((self.config.GAME_WIDTH, self.config.GAME_HEIGHT), pygame.SRCALPHA)
+            self._overlay_surface.fill((0, 0, 0, 150))
+        self.screen.blit(self._overlay_surface, (0, 0))
         
-        text1 = self.fonts['title'].render(line1, True, color)
-        text2 = self.fonts['medium'].render(line2, True, self.colors.WHITE)
+        text1 = self._render_text('title', line1, color)
+        text2 = self._render_text('medium', line2, self.colors.WHITE)
         
         text1_rect = text1.get_rect(center=(self.config.GAME_WIDTH // 2, self.config.GAME_HEIGHT // 2 - 60))
         text2_rect = text2.get_rect(center=(self.config.GAME_WIDTH // 2, self.config.GAME_HEIGHT // 2))
@@ -609,7 +1024,7 @@ class FlappyBirdAI:
         self.screen.blit(text2, text2_rect)
         
         if line3:
-            text3 = self.fonts['medium'].render(line3, True, self.colors.WHITE)
+            text3 = self._render_text('medium', line3, self.colors.WHITE)
             text3_rect = text3.get_rect(center=(self.config.GAME_WIDTH // 2, self.config.GAME_HEIGHT // 2 + 30))
             self.screen.blit(text3, text3_rect)
 
@@ -628,22 +1043,49 @@ class FlappyBirdAI:
             ("ESTATÍSTICAS", self.colors.WHITE),
             (f"Melhor Score: {self.best_score}", self.colors.PLAYER),
             (f"Geração: {self.generation}", self.colors.GREEN),
-            (f"Vivos: {len(self.active_birds)}", self.colors.AI),
-            (f"Velocidade: {self.simulation_speed}x", self.colors.PLAYER),
-            ("", None),
+            (f"Vivos: {self.population.alive_count}", self.colors.AI),
+            (f"Velocidade: {self._get_speed_text()}", self.colors.PLAYER),
+            (f"Passos/s: {self.steps_per_second}{self._get_cache_text()}", self.colors.PLAYER),
+            ("Salvando IA e gráfico..." if self.saving else "", self.colors.PLAYER),
             ("CONTROLES", self.colors.WHITE),
             ("S - Salvar IA", self.colors.GREEN),
             ("R - Reiniciar", self.colors.GREEN),
             ("D - Desenhar Todos/Melhor", self.colors.WHITE),
-            ("1/2 - Velocidade", self.colors.WHITE),
+            ("1/2 - Velocidade (até MÁX)", self.colors.WHITE),
+            (f"U - Turbo: {'ON' if self.turbo else 'OFF'}", self.colors.GREEN if self.turbo else self.colors.WHITE),
+            ("V - Replay da geração anterior" if self.last_replay is not None else "", self.colors.WHITE),
             ("", None),
             ("MELHORIAS IA", self.colors.WHITE),
             (f"Fitness Avançado (F): {fit_status}", fit_color),
             (f"Elitismo (E): {eli_status}", eli_color),
             (f"Mutação Adaptativa (A): {ada_status}", ada_color),
+            (f"Seleção (G): {SELECTION_STRATEGIES[self.selection_strategy][0]}", self.colors.WHITE),
+            (f"Otimizador (Z): {OPTIMIZERS[self.optimizer_name][0]}", self.colors.WHITE),
+            (self._get_decision_text(), self.colors.WHITE),
+            (self._get_evaluation_text(), self.colors.WHITE),
             (f"Taxa Mutação: {self._get_adaptive_mutation_rate()*100:.1f}%", self.colors.WHITE),
         ]
 
+    def _get_speed_text(self):
+        if self.turbo:
+            return "TURBO"
+        return "MÁX" if self.unlimited_speed else f"{self.simulation_speed}x"
+
+    def _get_cache_text(self):
+        cache = self.fitness_cache
+        if cache is None:
+            return ""
+        mode = "percursos fixos" if self.config.FIXED_COURSES else "percursos novos"
+        return f"  Cache ({mode}): {cache.hit_rate:.0%} ({cache.hits}/{cache.hits + cache.misses})"
+
+    def _get_decision_text(self):
+        mode = "manter" if self.config.DECISION_MODE == 'hold' else "pulo único"
+        return f"Decisão (K/H): a cada {self.config.DECISION_INTERVAL} frame(s), {mode}"
+
+    def _get_evaluation_text(self):
+        limit = f"até {self.config.MAX_EPISODE_FRAMES} frames" if self.config.MAX_EPISODE_FRAMES else "sem limite"
+        return f"Avaliação: {self.population.courses} percurso(s), {limit}"
+
     def _get_playing_stats(self):
         player_status, player_color = ("Ativo", self.colors.GREEN) if not self.player_bird.lost else ("Eliminado", self.colors.RED)
         ai_status, ai_color = ("Ativa", self.colors.GREEN) if not self.ai_opponent.lost else ("Eliminada", self.colors.RED)
@@ -661,6 +1103,29 @@ class FlappyBirdAI:
             ("T - Treinar IA", self.colors.WHITE),
         ]
 
+    def _get_replay_stats(self):
+        replay, bird = self.replay, self.replay_bird
+        if not self.replay_finished:
+            status, color = "Reproduzindo...", self.colors.WHITE
+        elif (bird.score, bird.pipes_passed) == (replay.score, replay.pipes_passed):
+            status, color = "Igual ao treino", self.colors.GREEN
+        else:
+            status, color = "Diferente do treino", self.colors.RED
+        return [
+            ("REPLAY", self.colors.WHITE),
+            (f"Geração: {replay.generation}", self.colors.GREEN),
+            (f"Frame: {self.frame_count}/{replay.frames}", self.colors.WHITE),
+            (f"Score: {bird.score} (treino: {replay.score})", self.colors.PLAYER),
+            (f"Canos: {bird.pipes_passed} (treino: {replay.pipes_passed})", self.colors.PLAYER),
+            (f"Velocidade: {self._get_speed_text()}", self.colors.PLAYER),
+            (status, color),
+            ("", None),
+            ("CONTROLES", self.colors.WHITE),
+            ("ESPAÇO - Rever", self.colors.WHITE),
+            ("V - Sair do replay", self.colors.WHITE),
+            ("1/2 - Velocidade (até MÁX)", self.colors.WHITE),
+        ]
+
     def _get_start_stats(self):
         ia_saved, ia_color = ("Sim", self.colors.GREEN) if os.path.exists(self.config.SAVE_FILE) else ("Não", self.colors.RED)
         on_off = lambda b: ("ON", self.colors.GREEN) if b else ("OFF", self.colors.RED)
@@ -681,6 +1146,9 @@ class FlappyBirdAI:
             (f"Fitness Avançado (F): {fit_status}", fit_color),
             (f"Elitismo (E): {eli_status}", eli_color),
             (f"Mutação Adaptativa (A): {ada_status}", ada_color),
+            (f"Seleção (G): {SELECTION_STRATEGIES[self.selection_strategy][0]}", self.colors.WHITE),
+            (f"Otimizador (Z): {OPTIMIZERS[self.optimizer_name][0]}", self.colors.WHITE),
+            (self._get_decision_text(), self.colors.WHITE),
             ("", None),
             (f"IA Salva: {ia_saved}", ia_color),
         ]
@@ -688,23 +1156,93 @@ class FlappyBirdAI:
     # --- Loop Principal ---
 
     def run(self):
-        """O loop principal do jogo."""
+        """O loop principal do jogo.
+
+        A tela é desenhada a TARGET_FPS quadros por segundo e, na velocidade
+        ilimitada, a simulação ocupa o tempo que o desenho deixa livre em cada
+        quadro. No turbo, os eventos continuam sendo tratados a cada quadro,
+        mas só se desenha a cada TURBO_RENDER_GENERATIONS gerações (ou a cada
+        TURBO_MAX_RENDER_INTERVAL segundos).
+        """
         running = True
+        frame_time = 1 / self.config.TARGET_FPS
+        draw_time = 0.0
+        rendered_generation, rendered_at = self.generation, time.perf_counter()
+        rate_steps, rate_start = self.steps, time.perf_counter()
         while running:
             running = self.handle_events()
+            turbo = self.turbo and self.game_state == GameState.TRAINING
+            
+            if self.game_state in [GameState.TRAINING, GameState.PLAYING, GameState.REPLAY]:
+                # Reserva o tempo do último desenho e uma folga para o `tick`
+                self.update(frame_time if turbo else max(0.002, frame_time - draw_time - 0.002))
             
-            if self.game_state in [GameState.TRAINING, GameState.PLAYING]:
-                self.update()
+            now = time.perf_counter()
+            if now - rate_start >= 0.5:
+                self.steps_per_second = int((self.steps - rate_steps) / (now - rate_start))
+                rate_steps, rate_start = self.steps, now
+            self.profiler.frame_done()
+            if self.profiler.enabled:
+                self.profiler.update_summary()
+            
+            if turbo:
+                generations = self.generation - rendered_generation
+                if 0 <= generations < self.config.TURBO_RENDER_GENERATIONS and now - rendered_at < self.config.TURBO_MAX_RENDER_INTERVAL:
+                    continue
             
             self.draw()
-            self.clock.tick(60)
+            rendered_generation, rendered_at = self.generation, time.perf_counter()
+            draw_time = rendered_at - now
+            if not turbo:
+                self.clock.tick(self.config.TARGET_FPS)
         
         # Não precisa mais plotar no final, pois é feito em tempo real
         # if self.game_state == GameState.TRAINING:
         #     self.plot_progress()
-            
+        
+        # A geração que terminou no último frame ainda não passou por `next_generation`
+        self.archive_last_generation()
+        self._wait_for_saves()
         pygame.quit()
 
 if __name__ == "__main__":
-    game = FlappyBirdAI()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Flappy Bird: Evolução de IA")
+    parser.add_argument('--seed', type=int, default=None, help="Semente para reproduzir o treino e os percursos de canos")
+    parser.add_argument('--checkpoint', nargs='?', const=Config.CHECKPOINT_FILE, default=None,
+                        help=f"Grava um checkpoint do treino a cada {Config.CHECKPOINT_INTERVAL} gerações (padrão: {Config.CHECKPOINT_FILE})")
+    parser.add_argument('--resume', default=None, help="Retoma o treino a partir deste checkpoint")
+    parser.add_argument('--archive', default=None, help="Guarda os genomas de todas as gerações neste diretório")
+    parser.add_argument('--fixed-courses', action='store_true',
+                        help="Repete os mesmos percursos em todas as gerações (os genomas repetidos vêm do cache)")
+    parser.add_argument('--optimizer', choices=list(OPTIMIZERS), default='ga',
+                        help="Algoritmo genético ('ga') ou estratégia evolutiva (padrão: ga)")
+    parser.add_argument('--replay', default=None, help="Abre direto a reprodução deste arquivo .replay")
+    parser.add_argument('--no-replays', action='store_true',
+                        help=f"Não grava o replay do melhor pássaro de cada geração em '{Config.REPLAY_DIR}'")
+    parser.add_argument('--profile', default=None,
+                        help="Liga o perfil por fase e grava os tempos de cada geração neste arquivo (.json ou .csv)")
+    parser.add_argument('--cprofile', type=int, nargs='?', const=Config.PROFILE_CAPTURE_FRAMES, default=None,
+                        help=f"Captura os primeiros N quadros com o cProfile (padrão: {Config.PROFILE_CAPTURE_FRAMES})")
+    args = parser.parse_args()
+    game = FlappyBirdAI(seed=args.seed)
+    game.checkpoint_file = args.checkpoint or args.resume
+    game.set_optimizer(args.optimizer)
+    game.config.FIXED_COURSES = args.fixed_courses
+    if not args.no_replays:
+        game.replay_dir = Config.REPLAY_DIR
+        game.replay_recorder = ReplayRecorder()
+    if args.archive:
+        game.archive = GenomeArchive(args.archive)
+    if args.resume:
+        game.resume(args.resume)
+    if args.profile:
+        game.profiler.enable()
+    if args.cprofile:
+        game.profiler.start_capture(args.cprofile)
+    if args.replay:
+        game.last_replay = Replay.load(args.replay)
+        game.start_replay(game.last_replay)
+    game.run()
+    if args.profile:
+        game.profiler.export(args.profile, game.generation)
+        print(f"Tempos por fase salvos em '{args.profile}'")
\ No newline at end of file
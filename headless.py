@@ -0,0 +1,264 @@
+"""Treinamento sem interface gráfica (headless).
+
+Roda o mesmo algoritmo genético do modo de treinamento (`_update_training_mode`
+e `next_generation`), mas sem janela, sem desenho e sem o limite de 60 FPS,
+para que o treino avance tão rápido quanto a CPU permitir.
+
+Exemplo:
+    python headless.py --population 200 --generations 100 --elitism --output resultados.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+# Mantém o stdout limpo para o CSV
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from archive import GenomeArchive
+from config import Config
+from distributed import DistributedEvaluator, parse_address
+from fitness_cache import FitnessCache
+from flappy_bird_ai import FlappyBirdAI, GameState
+from optimizers import OPTIMIZERS
+from parallel import ParallelEvaluator
+from replay import ReplayRecorder
+from selection import SELECTION_STRATEGIES
+
+
+class HeadlessTrainer:
+    """Executa gerações de treinamento sem renderização."""
+
+    # Intervalo (em frames) entre verificações do orçamento de tempo
+    TIME_CHECK_INTERVAL = 1000
+
+    def __init__(self, population_size, mutation_rate, enhancements=None, selection='roulette', workers=None, seed=None,
+                 decision_interval=1, decision_mode='hold', courses=1, max_frames=Config.MAX_EPISODE_FRAMES,
+                 checkpoint=None, checkpoint_interval=Config.CHECKPOINT_INTERVAL, resume=None, archive=None, listen=None,
+                 fitness_cache=Config.FITNESS_CACHE_SIZE, optimizer='ga', replays=None, fixed_courses=False):
+        if listen:
+            # Coordenador: as gerações são avaliadas pelos workers de `distributed.py` que se conectarem
+            self.evaluator = DistributedEvaluator(listen)
+        else:
+            self.evaluator = ParallelEvaluator(workers) if workers else None
+        self.evaluated = False # Se a população atual já foi avaliada pelo avaliador paralelo
+        self.game = FlappyBirdAI(headless=True, seed=seed)
+        self.game.config.POPULATION_SIZE = population_size
+        self.game.config.MUTATION_RATE = mutation_rate
+        self.game.selection_strategy = selection
+        self.game.set_optimizer(optimizer)
+        self.game.config.DECISION_INTERVAL = decision_interval
+        self.game.config.DECISION_MODE = decision_mode
+        self.game.config.EVALUATION_COURSES = courses
+        self.game.config.FIXED_COURSES = fixed_courses
+        self.game.config.MAX_EPISODE_FRAMES = max_frames
+        for name in enhancements or []:
+            self.game.ga_enhancements[name] = True
+        self.game.config.CHECKPOINT_INTERVAL = checkpoint_interval
+        self.game.checkpoint_file = checkpoint
+        self.game.archive = GenomeArchive(archive) if archive else None
+        # Com avaliador, a população é simulada nos workers, que também rodam sem cache
+        self.game.fitness_cache = FitnessCache(fitness_cache) if fitness_cache and not self.evaluator else None
+        # Replay do melhor pássaro de cada geração; com avaliador, o melhor é simulado de novo ao gravar
+        self.game.replay_dir = replays
+        self.game.replay_recorder = ReplayRecorder() if replays and not self.evaluator else None
+        if resume:
+            # O checkpoint traz população, histórico, geradores e configurações do treino
+            self.game.resume(resume)
+        else:
+            self.game.switch_mode(GameState.TRAINING, force_restart=True)
+
+    def run_generation(self, deadline=None):
+        """Simula a geração atual até todos os pássaros morrerem.
+
+        Retorna um dicionário com as estatísticas da geração, ou None se o
+        prazo (`deadline`, em `time.perf_counter()`) terminar antes disso.
+        """
+        if self.evaluator:
+            return self._run_generation_parallel()
+
+        game = self.game
+        start = time.perf_counter()
+        frames = 0
+
+        # Um frame com a população vazia dispara `next_generation`
+        if not game.population.alive_count:
+            game.step()
+        generation = game.generation
+
+        while game.population.alive_count:
+            game.step()
+            frames += 1
+            if deadline is not None and frames % self.TIME_CHECK_INTERVAL == 0:
+                if time.perf_counter() >= deadline:
+                    return None
+
+        population = game.population
+        elapsed = time.perf_counter() - start
+        return {
+            'generation': generation,
+            **self._score_stats(population),
+            'frames': frames,
+            'seconds': round(elapsed, 4),
+            'fps': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def _run_generation_parallel(self):
+        """Avalia a geração em vários processos (ou workers remotos), todos no mesmo percurso de canos."""
+        game = self.game
+        start = time.perf_counter()
+        if self.evaluated:
+            game.next_generation()
+
+        population = game.population
+        scores, pipes_passed = self.evaluator.evaluate(population.genomes, game.courses.seeds, game.evaluation_settings())
+        population.score[:], population.pipes_passed[:] = scores, pipes_passed
+        population.kill(np.ones(population.alive_count, dtype=bool))
+        self.evaluated = True
+
+        elapsed = time.perf_counter() - start
+        # Todos começam no frame 1, então o episódio dura o maior score
+        frames = int(population.score.max())
+        return {
+            'generation': game.generation,
+            **self._score_stats(population),
+            'frames': frames,
+            'seconds': round(elapsed, 4),
+            'fps': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    @staticmethod
+    def _score_stats(population):
+        """Melhor score, score médio e mais canos por genoma (média entre os percursos, como o fitness)."""
+        scores, pipes_passed = population.genome_scores()
+        # Com um percurso só, os valores são inteiros e o CSV continua igual ao de antes
+        value = (lambda x: int(x)) if population.courses == 1 else (lambda x: round(float(x), 2))
+        return {
+            'best_score': value(scores.max()),
+            'mean_score': round(float(scores.mean()), 2),
+            'best_pipes': value(pipes_passed.max()),
+        }
+
+    def archive_last_generation(self):
+        """Arquiva a última geração, que terminou sem passar por `next_generation`."""
+        self.game.archive_last_generation()
+
+    def save_last_replay(self):
+        """Grava o replay da última geração, que terminou sem passar por `next_generation`."""
+        game = self.game
+        if game.replay_dir and not game.population.alive_count:
+            game.save_best_replay(game.generation)
+
+    def close(self):
+        if self.evaluator:
+            self.evaluator.close()
+
+    def run(self, generations=None, time_budget=None):
+        """Gera os resultados de cada geração até atingir um dos limites."""
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        completed = 0
+        while generations is None or completed < generations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            result = self.run_generation(deadline)
+            if result is None:
+                break
+            completed += 1
+            yield result
+
+    def save_best(self):
+        """Salva o cérebro do melhor pássaro da última geração avaliada."""
+        best_bird = self.game.find_best_bird()
+        if best_bird:
+            best_bird.brain.save(self.game.config.SAVE_FILE)
+            print(f"Melhor IA salva em '{self.game.config.SAVE_FILE}'!", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Treina a IA do Flappy Bird sem interface gráfica.")
+    parser.add_argument('--population', type=int, default=50, help="Tamanho da população (padrão: 50)")
+    parser.add_argument('--mutation-rate', type=float, default=0.05, help="Taxa de mutação base (padrão: 0.05)")
+    parser.add_argument('--enhanced-fitness', action='store_true', help="Ativa o fitness aprimorado")
+    parser.add_argument('--elitism', action='store_true', help="Ativa o elitismo")
+    parser.add_argument('--adaptive-mutation', action='store_true', help="Ativa a mutação adaptativa")
+    parser.add_argument('--selection', choices=list(SELECTION_STRATEGIES), default='roulette', help="Estratégia de seleção de pais (padrão: roulette)")
+    parser.add_argument('--optimizer', choices=list(OPTIMIZERS), default='ga',
+                        help="Algoritmo genético ('ga') ou estratégia evolutiva: openai-es, cma-es (padrão: ga)")
+    parser.add_argument('--generations', type=int, default=None, help="Número de gerações a treinar")
+    parser.add_argument('--time-budget', type=float, default=None, help="Tempo máximo de treino em segundos")
+    parser.add_argument('--workers', type=int, default=None, help="Avalia cada geração em N processos (padrão: 1 processo, sem pool)")
+    parser.add_argument('--decision-interval', type=int, default=1, help="Consulta a rede a cada N frames (padrão: 1)")
+    parser.add_argument('--decision-mode', choices=['hold', 'once'], default='hold',
+                        help="Entre decisões: 'hold' repete a última, 'once' pula só no frame da decisão")
+    parser.add_argument('--courses', type=int, default=1, help="Percursos por geração; o fitness é a média entre eles (padrão: 1)")
+    parser.add_argument('--max-frames', type=int, default=Config.MAX_EPISODE_FRAMES,
+                        help=f"Encerra o episódio quando os sobreviventes chegam a N frames; 0 desativa (padrão: {Config.MAX_EPISODE_FRAMES})")
+    parser.add_argument('--seed', type=int, default=None, help="Semente: o mesmo valor reproduz os mesmos resultados")
+    parser.add_argument('--checkpoint', default=None, help="Grava o estado completo do treino neste arquivo .npz")
+    parser.add_argument('--checkpoint-interval', type=int, default=Config.CHECKPOINT_INTERVAL,
+                        help=f"Gerações entre checkpoints (padrão: {Config.CHECKPOINT_INTERVAL})")
+    parser.add_argument('--resume', default=None,
+                        help="Retoma o treino deste checkpoint (as opções do algoritmo genético vêm do arquivo)")
+    parser.add_argument('--archive', default=None, help="Guarda os genomas de todas as gerações neste diretório")
+    parser.add_argument('--listen', default=None,
+                        help="Avalia as gerações nos workers de distributed.py que se conectarem a HOST:PORTA")
+    parser.add_argument('--fixed-courses', action='store_true',
+                        help="Repete os mesmos percursos em todas as gerações, para o cache reaproveitar elites e filhos sem mutação")
+    parser.add_argument('--fitness-cache', type=int, default=Config.FITNESS_CACHE_SIZE,
+                        help=f"Resultados guardados por (genoma, percurso) para não simular repetidos; 0 desliga (padrão: {Config.FITNESS_CACHE_SIZE})")
+    parser.add_argument('--replays', default=Config.REPLAY_DIR,
+                        help=f"Diretório dos replays do melhor pássaro de cada geração (padrão: {Config.REPLAY_DIR})")
+    parser.add_argument('--no-replays', action='store_true', help="Não grava replays")
+    parser.add_argument('--profile', default=None,
+                        help="Grava o tempo de cada fase por geração neste arquivo (.json ou .csv; só sem --workers)")
+    parser.add_argument('--output', default=None, help="Arquivo CSV para os resultados (padrão: stdout)")
+    parser.add_argument('--save', action='store_true', help="Salva a melhor IA ao final do treino")
+    args = parser.parse_args(argv)
+    if args.generations is None and args.time_budget is None:
+        parser.error("informe --generations e/ou --time-budget")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    enhancements = [name for name in ('enhanced_fitness', 'elitism', 'adaptive_mutation') if getattr(args, name)]
+    trainer = HeadlessTrainer(args.population, args.mutation_rate, enhancements, args.selection, args.workers, args.seed,
+                              args.decision_interval, args.decision_mode, args.courses, args.max_frames or None,
+                              args.checkpoint, args.checkpoint_interval, args.resume, args.archive,
+                              parse_address(args.listen) if args.listen else None, args.fitness_cache, args.optimizer,
+                              None if args.no_replays else args.replays, args.fixed_courses)
+    if args.profile:
+        trainer.game.profiler.enable()
+
+    fields = ['generation', 'best_score', 'mean_score', 'best_pipes', 'frames', 'seconds', 'fps']
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        for result in trainer.run(args.generations, args.time_budget):
+            writer.writerow(result)
+            out.flush()
+        trainer.archive_last_generation()
+        trainer.save_last_replay()
+    finally:
+        trainer.close()
+        if out is not sys.stdout:
+            out.close()
+        if args.profile:
+            trainer.game.profiler.export(args.profile, trainer.game.generation)
+
+    cache = trainer.game.fitness_cache
+    if cache is not None:
+        mode = "percursos fixos" if trainer.game.config.FIXED_COURSES else "percursos novos"
+        print(f"Cache de fitness ({mode}): {cache.hit_rate:.0%} dos pássaros ({cache.hits}/{cache.hits + cache.misses}), "
+              f"{cache.skipped_frames} frames economizados", file=sys.stderr)
+
+    if args.save:
+        trainer.save_best()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Algoritmo genético em modelo de ilhas.
+
+K populações independentes evoluem em paralelo, uma por processo, cada uma
+com a mesma lógica de `next_generation` (seleção, elitismo e mutação
+adaptativa). A cada `MIGRATION_INTERVAL` gerações, os `MIGRANTS` melhores
+pássaros de cada ilha migram para outra ilha, em anel ou de forma aleatória.
+
+Exemplo:
+    python islands.py --islands 4 --population 100 --target-score 3000 --generations 200 --compare
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from config import Config
+from population import Population
+from selection import SELECTION_STRATEGIES
+
+TOPOLOGIES = ('ring', 'random')
+
+def _island_main(conn, seed, population_size, mutation_rate, enhancements, selection, migrants):
+    """Loop de um processo-ilha: evolui sob comando do coordenador."""
+    from flappy_bird_ai import FlappyBirdAI, GameState
+
+    game = FlappyBirdAI(headless=True, seed=seed)
+    # Sem cache de fitness, como os workers do headless, para comparar com a população única (também sem)
+    game.fitness_cache = None
+    game.config.POPULATION_SIZE = population_size
+    game.config.MUTATION_RATE = mutation_rate
+    game.selection_strategy = selection
+    for name in enhancements:
+        game.ga_enhancements[name] = True
+    game.switch_mode(GameState.TRAINING, force_restart=True)
+    evaluated = False
+    conn.send('ready')
+
+    while True:
+        command, generations, immigrants = conn.recv()
+        if command == 'stop':
+            break
+
+        history = []
+        for i in range(generations):
+            if evaluated:
+                game.next_generation()
+            if i == 0 and immigrants is not None:
+                _receive_migrants(game, immigrants)
+            population = game.run_episode(game.population, game.courses.seeds)
+            evaluated = True
+            history.append((int(population.score.max()), time.monotonic()))
+
+        conn.send((history, _select_migrants(game.population, migrants)))
+    conn.close()
+
+def _select_migrants(population, count):
+    """Copia os `count` genomas de maior score (média nos percursos)."""
+    scores, _ = population.genome_scores()
+    best = np.argsort(-scores, kind='stable')[:count]
+    return population.genomes.weights_ih[best].copy(), population.genomes.weights_ho[best].copy()
+
+def _receive_migrants(game, immigrants):
+    """Substitui os últimos pássaros da nova população (nunca os elites) pelos imigrantes."""
+    weights_ih, weights_ho = immigrants
+    genomes = game.population.genomes
+    count = min(len(weights_ih), len(genomes))
+    if count:
+        genomes.weights_ih[-count:] = weights_ih[:count]
+        genomes.weights_ho[-count:] = weights_ho[:count]
+        game.population = Population(genomes, game.population.courses)
+
+
+class IslandModel:
+    """Coordena as ilhas e faz as migrações entre elas."""
+
+    def __init__(self, islands=Config.ISLANDS, population_size=Config.POPULATION_SIZE,
+                 mutation_rate=Config.MUTATION_RATE, enhancements=(), selection='roulette',
+                 migration_interval=Config.MIGRATION_INTERVAL, migrants=Config.MIGRANTS,
+                 topology=Config.MIGRATION_TOPOLOGY, seed=None):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Topologia desconhecida: {topology!r} (use {', '.join(TOPOLOGIES)})")
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.rng = np.random.default_rng(seed)
+
+        self.connections = []
+        self.processes = []
+        for island_seed in np.random.SeedSequence(seed).generate_state(islands):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_island_main,
+                args=(child_conn, int(island_seed), population_size, mutation_rate, list(enhancements), selection, migrants),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+        # Espera todas as ilhas terminarem de inicializar antes de começar a cronometrar
+        for conn in self.connections:
+            conn.recv()
+
+    def _route(self, outgoing):
+        """Distribui os emigrantes de cada ilha conforme a topologia."""
+        islands = len(outgoing)
+        if islands < 2 or self.migrants <= 0:
+            return [None] * islands
+        if self.topology == 'ring':
+            destinations = [(i + 1) % islands for i in range(islands)]
+        else:
+            destinations = [(i + self.rng.integers(1, islands)) % islands for i in range(islands)]
+
+        incoming = [[] for _ in range(islands)]
+        for source, destination in enumerate(destinations):
+            incoming[destination].append(outgoing[source])
+        return [
+            (np.concatenate([ih for ih, _ in group]), np.concatenate([ho for _, ho in group])) if group else None
+            for group in incoming
+        ]
+
+    def run(self, generations=None, target_score=None, time_budget=None):
+        """Gera as estatísticas de cada geração até atingir um dos limites.
+
+        Cada item traz o melhor score entre todas as ilhas, o melhor de cada
+        ilha e o tempo decorrido desde o início, em segundos. `target_score`
+        sozinho não é limite: um alvo nunca atingido rodaria para sempre.
+        """
+        if generations is None and time_budget is None:
+            raise ValueError("Informe generations e/ou time_budget")
+        start = time.monotonic()
+        generation = 0
+        immigrants = [None] * len(self.connections)
+        while generations is None or generation < generations:
+            epoch = self.migration_interval
+            if generations is not None:
+                epoch = min(epoch, generations - generation)
+            for conn, incoming in zip(self.connections, immigrants):
+                conn.send(('run', epoch, incoming))
+            results = [conn.recv() for conn in self.connections]
+
+            reached = False
+            for i in range(epoch):
+                scores = [history[i][0] for history, _ in results]
+                elapsed = max(history[i][1] for history, _ in results) - start
+                generation += 1
+                reached = reached or (target_score is not None and max(scores) >= target_score)
+                yield {'generation': generation, 'best_score': max(scores),
+                       'island_scores': scores, 'seconds': round(elapsed, 4)}
+
+            immigrants = self._route([migrants for _, migrants in results])
+            if reached or (time_budget is not None and time.monotonic() - start >= time_budget):
+                break
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(('stop', 0, None))
+            conn.close()
+        for process in self.processes:
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def time_to_target(results, target_score):
+    """Retorna (geração, segundos) da primeira geração que atinge `target_score`."""
+    for result in results:
+        if result['best_score'] >= target_score:
+            return result['generation'], result['seconds']
+    return None, None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Treina a IA do Flappy Bird em modelo de ilhas.")
+    parser.add_argument('--islands', type=int, default=Config.ISLANDS, help=f"Número de ilhas/processos (padrão: {Config.ISLANDS})")
+    parser.add_argument('--population', type=int, default=Config.POPULATION_SIZE, help="Tamanho da população de cada ilha")
+    parser.add_argument('--mutation-rate', type=float, default=Config.MUTATION_RATE, help="Taxa de mutação base")
+    parser.add_argument('--enhanced-fitness', action='store_true', help="Ativa o fitness aprimorado")
+    parser.add_argument('--elitism', action='store_true', help="Ativa o elitismo")
+    parser.add_argument('--adaptive-mutation', action='store_true', help="Ativa a mutação adaptativa")
+    parser.add_argument('--migration-interval', type=int, default=Config.MIGRATION_INTERVAL, help="Gerações entre migrações")
+    parser.add_argument('--migrants', type=int, default=Config.MIGRANTS, help="Pássaros enviados por ilha a cada migração")
+    parser.add_argument('--topology', choices=TOPOLOGIES, default=Config.MIGRATION_TOPOLOGY, help="Topologia de migração")
+    parser.add_argument('--generations', type=int, default=None, help="Número máximo de gerações")
+    parser.add_argument('--time-budget', type=float, default=None, help="Tempo máximo em segundos")
+    parser.add_argument('--target-score', type=int, default=None, help="Para ao atingir este score")
+    parser.add_argument('--selection', choices=list(SELECTION_STRATEGIES), default='roulette', help="Estratégia de seleção de pais (padrão: roulette)")
+    parser.add_argument('--seed', type=int, default=None, help="Semente das ilhas (e da população única de --compare)")
+    parser.add_argument('--compare', action='store_true',
+                        help="Também treina uma população única (ilhas x população) e compara o tempo até o alvo")
+    args = parser.parse_args(argv)
+    if args.generations is None and args.time_budget is None:
+        parser.error("informe --generations e/ou --time-budget (--target-score sozinho pode nunca terminar)")
+    if args.target_score is not None and Config.MAX_EPISODE_FRAMES is not None and args.target_score > Config.MAX_EPISODE_FRAMES:
+        parser.error(f"--target-score não pode passar de MAX_EPISODE_FRAMES ({Config.MAX_EPISODE_FRAMES}), o maior score possível")
+    if args.compare and args.target_score is None:
+        parser.error("--compare requer --target-score")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    enhancements = [name for name in ('enhanced_fitness', 'elitism', 'adaptive_mutation') if getattr(args, name)]
+
+    with IslandModel(args.islands, args.population, args.mutation_rate, enhancements,
+                     migration_interval=args.migration_interval, migrants=args.migrants,
+                     selection=args.selection, topology=args.topology, seed=args.seed) as model:
+        results = []
+        for result in model.run(args.generations, args.target_score, args.time_budget):
+            results.append(result)
+            print(f"Geração {result['generation']}: melhor {result['best_score']} {result['island_scores']} ({result['seconds']}s)")
+
+    if args.target_score is None:
+        return
+    generation, seconds = time_to_target(results, args.target_score)
+    print(f"Ilhas: alvo {args.target_score} " + (f"na geração {generation} em {seconds}s" if seconds is not None else "não atingido"))
+
+    if args.compare:
+        from headless import HeadlessTrainer
+        trainer = HeadlessTrainer(args.islands * args.population, args.mutation_rate, enhancements, args.selection,
+                                  seed=args.seed, fitness_cache=0)
+        single = []
+        start = time.monotonic()
+        for result in trainer.run(args.generations, args.time_budget):
+            single.append({'generation': result['generation'], 'best_score': result['best_score'],
+                           'seconds': round(time.monotonic() - start, 4)})
+            if result['best_score'] >= args.target_score:
+                break
+        generation, seconds = time_to_target(single, args.target_score)
+        print(f"População única: alvo {args.target_score} " + (f"na geração {generation} em {seconds}s" if seconds is not None else "não atingido"))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,26 @@ import pickle
 import random
 
 class NeuralNetwork:
-    def __init__(self, input_nodes, hidden_nodes, output_nodes):
+    def __init__(self, input_nodes, hidden_nodes, output_nodes, rng=None):
         self.input_nodes = input_nodes
         self.hidden_nodes = hidden_nodes
         self.output_nodes = output_nodes
         
-        self.weights_ih = np.random.uniform(-1, 1, (self.hidden_nodes, self.input_nodes))
-        self.weights_ho = np.random.uniform(-1, 1, (self.output_nodes, self.hidden_nodes))
+        # Sem `rng`, usa o gerador global do NumPy
+        rng = rng or np.random
+        self.weights_ih = rng.uniform(-1, 1, (self.hidden_nodes, self.input_nodes))
+        self.weights_ho = rng.uniform(-1, 1, (self.output_nodes, self.hidden_nodes))
     
+    @classmethod
+    def from_weights(cls, weights_ih, weights_ho):
+        """Cria uma rede a partir de matrizes de pesos existentes, sem copiá-las."""
+        nn = cls.__new__(cls)
+        nn.hidden_nodes, nn.input_nodes = weights_ih.shape
+        nn.output_nodes = weights_ho.shape[0]
+        nn.weights_ih = weights_ih
+        nn.weights_ho = weights_ho
+        return nn
+
     @staticmethod
     def _sigmoid(x):
         return 1 / (1 + np.exp(-x))
@@ -30,16 +42,15 @@ class NeuralNetwork:
         return final_outputs[0, 0]
     
     def copy(self):
-        new_nn = NeuralNetwork(self.input_nodes, self.hidden_nodes, self.output_nodes)
-        new_nn.weights_ih = self.weights_ih.copy()
-        new_nn.weights_ho = self.weights_ho.copy()
-        return new_nn
+        return NeuralNetwork.from_weights(self.weights_ih.copy(), self.weights_ho.copy())
     
-    def mutate(self, rate):
+    def mutate(self, rate, rng=None):
         # Função de mutação que adiciona um pequeno valor aleatório
+        chance = rng.random if rng else random.random
+        normal = rng.normal if rng else np.random.normal
         def mutate_func(val):
-            if random.random() < rate:
-                return val + np.random.normal(0, 0.1)
+            if chance() < rate:
+                return val + normal(0, 0.1)
             return val
         
         # Vetorizando a função para aplicar em toda a matriz de pesos
@@ -55,3 +66,62 @@ class NeuralNetwork:
     def load(filename):
         with open(filename, 'rb') as f:
             return pickle.load(f)
+
+
+class PopulationBrain:
+    """Cérebros de uma população inteira empilhados em arrays 3-D contíguos.
+
+    `weights_ih` tem formato (N, hidden, input) e `weights_ho` (N, output, hidden),
+    de modo que as decisões de todos os pássaros vivos saem de uma única
+    multiplicação de matrizes em lote, em vez de uma chamada a `predict` por pássaro.
+    """
+
+    def __init__(self, weights_ih, weights_ho):
+        self.weights_ih = np.ascontiguousarray(weights_ih, dtype=np.float64)
+        self.weights_ho = np.ascontiguousarray(weights_ho, dtype=np.float64)
+
+    @classmethod
+    def from_networks(cls, networks):
+        """Empilha os pesos de uma lista de `NeuralNetwork`."""
+        return cls(np.stack([nn.weights_ih for nn in networks]),
+                   np.stack([nn.weights_ho for nn in networks]))
+
+    @classmethod
+    def random(cls, size, input_nodes, hidden_nodes, output_nodes, rng=None):
+        """Cria `size` cérebros com pesos uniformes em [-1, 1], como `NeuralNetwork`."""
+        rng = rng or np.random
+        return cls(rng.uniform(-1, 1, (size, hidden_nodes, input_nodes)),
+                   rng.uniform(-1, 1, (size, output_nodes, hidden_nodes)))
+
+    def __len__(self):
+        return self.weights_ih.shape[0]
+
+    def network(self, index):
+        """Retorna uma `NeuralNetwork` cujos pesos são views da linha `index`."""
+        return NeuralNetwork.from_weights(self.weights_ih[index], self.weights_ho[index])
+
+    def predict(self, inputs):
+        """Calcula a primeira saída da rede para cada linha de `inputs` (N, input)."""
+        inputs = np.asarray(inputs, dtype=np.float64)[:, :, np.newaxis]
+        hidden_outputs = NeuralNetwork._sigmoid(np.matmul(self.weights_ih, inputs))
+        final_outputs = NeuralNetwork._sigmoid(np.matmul(self.weights_ho, hidden_outputs))
+        return final_outputs[:, 0, 0]
+
+    def take(self, indices):
+        """Retorna um novo `PopulationBrain` com cópias das linhas `indices`."""
+        return PopulationBrain(self.weights_ih[indices], self.weights_ho[indices])
+
+    def mutate(self, rate, rng, start=0):
+        """Versão vetorizada de `NeuralNetwork.mutate` para as linhas a partir de `start`."""
+        for weights in (self.weights_ih[start:], self.weights_ho[start:]):
+            mask = rng.random(weights.shape) < rate
+            weights[mask] += rng.normal(0, 0.1, np.count_nonzero(mask))
+
+    def decide(self, inputs):
+        """Retorna a máscara booleana de quais pássaros devem pular."""
+        return self.predict(inputs) > 0.5
+
+    def compact(self, keep):
+        """Remove os cérebros cuja posição em `keep` (máscara booleana) é falsa."""
+        self.weights_ih = self.weights_ih[keep]
+        self.weights_ho = self.weights_ho[keep]
@@ -0,0 +1,201 @@
+"""Estratégias evolutivas como alternativa ao algoritmo genético.
+
+Os otimizadores trabalham sobre o vetor achatado dos pesos de cada genoma
+(`weights_ih` seguido de `weights_ho`) e seguem a mesma interface:
+
+    optimizer.tell(genomes, fitness)              # genomas avaliados e o fitness de cada um
+    genomes = optimizer.ask(size, rng)            # PopulationBrain da próxima geração
+
+Só a ordem do fitness importa (maior é melhor), então o fitness normalizado
+de `compute_fitness` serve direto. O ruído de cada genoma é recuperado a
+partir dos seus pesos e da média atual, então `tell` não depende de estado
+guardado por `ask` e funciona igual depois de retomar um checkpoint. O
+primeiro `tell` (a população aleatória inicial, ou a de outro otimizador)
+apenas coloca a média no melhor genoma.
+
+O algoritmo genético continua em `FlappyBirdAI.next_generation`.
+"""
+import numpy as np
+
+from config import Config
+from neural_network import PopulationBrain
+from population import Population
+
+SHAPE_IH = (Population.HIDDEN_NODES, Population.INPUT_NODES)
+SHAPE_HO = (Population.OUTPUT_NODES, Population.HIDDEN_NODES)
+DIMENSIONS = SHAPE_IH[0] * SHAPE_IH[1] + SHAPE_HO[0] * SHAPE_HO[1]
+
+def flatten(genomes):
+    """Pesos de cada genoma de `genomes` (PopulationBrain) em uma linha de uma matriz (N, DIMENSIONS)."""
+    return np.concatenate([genomes.weights_ih.reshape(len(genomes), -1),
+                           genomes.weights_ho.reshape(len(genomes), -1)], axis=1)
+
+def unflatten(flat):
+    """Inverso de `flatten`: um `PopulationBrain` com as linhas de `flat`."""
+    split = SHAPE_IH[0] * SHAPE_IH[1]
+    return PopulationBrain(flat[:, :split].reshape(-1, *SHAPE_IH), flat[:, split:].reshape(-1, *SHAPE_HO))
+
+def centered_ranks(fitness):
+    """Fitness trocado pela posição no ranking, entre -0.5 e 0.5; empates recebem a posição média."""
+    if len(fitness) < 2:
+        return np.zeros(len(fitness))
+    _, inverse, counts = np.unique(fitness, return_inverse=True, return_counts=True)
+    starts = np.cumsum(counts) - counts
+    ranks = (starts + (counts - 1) / 2)[inverse.ravel()]
+    return ranks / (len(fitness) - 1) - 0.5
+
+def mirrored_noise(size, dimensions, rng, antithetic=True):
+    """Ruído normal (size, dimensions); com `antithetic`, a segunda metade é a primeira com o sinal trocado.
+
+    Com `size` ímpar, a última linha é zero (a própria média).
+    """
+    if not antithetic:
+        return rng.standard_normal((size, dimensions))
+    half = rng.standard_normal((size // 2, dimensions))
+    return np.concatenate([half, -half, np.zeros((size % 2, dimensions))])
+
+
+class OpenAIES:
+    """OpenAI-ES (Salimans et al., 2017): gradiente estimado do fitness suavizado, com Adam.
+
+    Cada genoma é `mean + sigma * ruído`. O gradiente é a média do ruído
+    pesada pelo ranking centrado do fitness, e a média sobe por ele com o
+    otimizador Adam. `weight_decay` puxa os pesos para zero.
+    """
+    name = 'openai-es'
+    STATE = ('mean', 'moment', 'velocity', 'steps')
+
+    def __init__(self, sigma=Config.ES_SIGMA, learning_rate=Config.ES_LEARNING_RATE, weight_decay=0.005, antithetic=True,
+                 beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.antithetic = antithetic
+        self.beta1, self.beta2, self.epsilon = beta1, beta2, epsilon
+        self.mean = None
+        self.moment = np.zeros(DIMENSIONS) # Primeiro e segundo momentos do Adam
+        self.velocity = np.zeros(DIMENSIONS)
+        self.steps = 0
+
+    def tell(self, genomes, fitness):
+        flat = flatten(genomes)
+        if self.mean is None:
+            self.mean = flat[np.argmax(fitness)].copy()
+            return
+        noise = (flat - self.mean) / self.sigma
+        gradient = centered_ranks(fitness) @ noise / (len(flat) * self.sigma) - self.weight_decay * self.mean
+
+        self.steps += 1
+        self.moment = self.beta1 * self.moment + (1 - self.beta1) * gradient
+        self.velocity = self.beta2 * self.velocity + (1 - self.beta2) * gradient ** 2
+        step_size = self.learning_rate * np.sqrt(1 - self.beta2 ** self.steps) / (1 - self.beta1 ** self.steps)
+        self.mean = self.mean + step_size * self.moment / (np.sqrt(self.velocity) + self.epsilon)
+
+    def ask(self, size, rng):
+        return unflatten(self.mean + self.sigma * mirrored_noise(size, DIMENSIONS, rng, self.antithetic))
+
+
+class CMAES:
+    """CMA-ES (Hansen, 2016) com matriz de covariância completa.
+
+    A seleção é pelo ranking (os `mu` melhores, com pesos logarítmicos), e os
+    parâmetros da estratégia são recalculados a cada geração a partir do
+    tamanho da população, que pode mudar durante o treino. Com `antithetic`,
+    as amostras vêm em pares espelhados e só a melhor de cada par entra na
+    seleção (seleção por pares), o que evita que as duas metades se anulem.
+    """
+    name = 'cma-es'
+    STATE = ('mean', 'sigma', 'covariance', 'path_sigma', 'path_c', 'generation')
+
+    def __init__(self, sigma=Config.CMA_SIGMA, antithetic=True):
+        self.antithetic = antithetic
+        self.mean = None
+        self.sigma = sigma
+        self.covariance = np.eye(DIMENSIONS)
+        self.path_sigma = np.zeros(DIMENSIONS)
+        self.path_c = np.zeros(DIMENSIONS)
+        self.generation = 0
+
+    def _eigen(self):
+        """Retorna (B, D) com covariância = B diag(D²) Bᵀ."""
+        values, vectors = np.linalg.eigh(self.covariance)
+        return vectors, np.sqrt(np.maximum(values, 1e-20))
+
+    def tell(self, genomes, fitness):
+        flat = flatten(genomes)
+        if self.mean is None:
+            self.mean = flat[np.argmax(fitness)].copy()
+            return
+        steps = (flat - self.mean) / self.sigma
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if self.antithetic and len(flat) >= 2:
+            # Seleção por pares: de cada par espelhado, só o melhor concorre
+            half = len(flat) // 2
+            first_wins = fitness[:half] >= fitness[half:2 * half]
+            winners = np.where(first_wins, np.arange(half), np.arange(half) + half)
+            steps, fitness = steps[winners], fitness[winners]
+
+        n = DIMENSIONS
+        candidates = len(steps)
+        mu = max(1, candidates // 2)
+        weights = np.log((candidates + 1) / 2) - np.log(np.arange(1, mu + 1)) if candidates > 2 else np.ones(mu)
+        weights /= weights.sum()
+        mu_eff = 1 / np.sum(weights ** 2)
+        c_c = (4 + mu_eff / n) / (n + 4 + 2 * mu_eff / n)
+        c_sigma = (mu_eff + 2) / (n + mu_eff + 5)
+        c_1 = 2 / ((n + 1.3) ** 2 + mu_eff)
+        c_mu = min(1 - c_1, 2 * (mu_eff - 2 + 1 / mu_eff) / ((n + 2) ** 2 + mu_eff))
+        damping = 1 + 2 * max(0.0, np.sqrt((mu_eff - 1) / (n + 1)) - 1) + c_sigma
+        chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        best = steps[np.argsort(-fitness, kind='stable')[:mu]]
+        step = weights @ best
+        self.mean = self.mean + self.sigma * step
+
+        vectors, scales = self._eigen()
+        inverse_sqrt = vectors @ ((vectors.T @ step) / scales)
+        self.generation += 1
+        self.path_sigma = (1 - c_sigma) * self.path_sigma + np.sqrt(c_sigma * (2 - c_sigma) * mu_eff) * inverse_sqrt
+        norm = np.linalg.norm(self.path_sigma) / np.sqrt(1 - (1 - c_sigma) ** (2 * self.generation))
+        # Sem `h_sigma`, o passo está longo demais e a trajetória não entra na covariância
+        h_sigma = float(norm / chi_n < 1.4 + 2 / (n + 1))
+        self.path_c = (1 - c_c) * self.path_c + h_sigma * np.sqrt(c_c * (2 - c_c) * mu_eff) * step
+
+        rank_one = np.outer(self.path_c, self.path_c) + (1 - h_sigma) * c_c * (2 - c_c) * self.covariance
+        rank_mu = (best.T * weights) @ best
+        self.covariance = (1 - c_1 - c_mu) * self.covariance + c_1 * rank_one + c_mu * rank_mu
+        self.covariance = (self.covariance + self.covariance.T) / 2
+        self.sigma *= np.exp(min(1.0, (c_sigma / damping) * (np.linalg.norm(self.path_sigma) / chi_n - 1)))
+
+    def ask(self, size, rng):
+        vectors, scales = self._eigen()
+        noise = mirrored_noise(size, DIMENSIONS, rng, self.antithetic)
+        return unflatten(self.mean + self.sigma * (noise * scales) @ vectors.T)
+
+
+# Nome exibido e classe de cada otimizador; 'ga' é o algoritmo genético de `next_generation`
+OPTIMIZERS = {
+    'ga': ('Genético', None),
+    'openai-es': ('OpenAI-ES', OpenAIES),
+    'cma-es': ('CMA-ES', CMAES),
+}
+
+def create_optimizer(name):
+    """Cria o otimizador `name`, ou None para o algoritmo genético."""
+    _, cls = OPTIMIZERS[name]
+    return cls() if cls else None
+
+def optimizer_state(optimizer):
+    """Estado de `optimizer` como arrays, para o checkpoint (vazio antes do primeiro `tell`)."""
+    if optimizer is None or optimizer.mean is None:
+        return {}
+    return {name: np.asarray(getattr(optimizer, name)) for name in optimizer.STATE}
+
+def restore_optimizer(name, state):
+    """Recria o otimizador `name` com o estado salvo por `optimizer_state`."""
+    optimizer = create_optimizer(name)
+    if optimizer is not None and state:
+        for attribute in optimizer.STATE:
+            value = np.array(state[attribute])
+            setattr(optimizer, attribute, value.item() if value.ndim == 0 else value)
+    return optimizer
@@ -0,0 +1,122 @@
+"""Avaliação paralela da população em vários processos.
+
+Cada pássaro de uma geração é independente dos demais quando o percurso de
+canos é o mesmo, então a população é dividida em blocos e cada processo
+simula o seu bloco com `FlappyBirdAI.run_episode`, em todos os percursos.
+Os genomas vão para os processos por memória compartilhada (sem serializar
+`NeuralNetwork`) e só as matrizes de score e canos ultrapassados voltam.
+"""
+import multiprocessing
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from neural_network import PopulationBrain
+from population import Population
+
+# Instância headless criada uma vez por processo do pool
+_worker_game = None
+
+def _init_worker():
+    global _worker_game
+    from flappy_bird_ai import FlappyBirdAI
+    _worker_game = FlappyBirdAI(headless=True)
+    # Cada processo recebe blocos diferentes a cada geração; o cache fica só no processo principal
+    _worker_game.fitness_cache = None
+
+def evaluate_genomes(genomes, course_seeds, game=None, settings=None):
+    """Avalia `genomes` (PopulationBrain) em um único processo.
+
+    `settings` sobrescreve atributos de `Config` de `EVALUATION_SETTINGS`
+    (ver `FlappyBirdAI.evaluation_settings`), que entram na chave do cache de
+    fitness, só durante esta avaliação: a configuração de `game` é restaurada
+    no fim. Retorna as matrizes `(scores, pipes_passed)` de formato
+    (percursos, genomas).
+    """
+    from flappy_bird_ai import EVALUATION_SETTINGS, FlappyBirdAI
+    settings = settings or {}
+    unknown = sorted(set(settings) - set(EVALUATION_SETTINGS))
+    if unknown:
+        raise ValueError(f"Configurações que não fazem parte da avaliação: {', '.join(unknown)}")
+    if game is None:
+        game = FlappyBirdAI(headless=True)
+    previous = {name: getattr(game.config, name) for name in settings}
+    for name, value in settings.items():
+        setattr(game.config, name, value)
+    try:
+        shape = (len(course_seeds), len(genomes))
+        population = game.run_episode(Population(genomes, len(course_seeds)), course_seeds)
+    finally:
+        for name, value in previous.items():
+            setattr(game.config, name, value)
+    return population.score.reshape(shape), population.pipes_passed.reshape(shape)
+
+def _evaluate_chunk(shm_name, shapes, start, stop, course_seeds, settings):
+    """Avalia as linhas [start, stop) dos genomas guardados na memória compartilhada."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        weights_ih, weights_ho = _shared_arrays(shm.buf, shapes)
+        # Copia o bloco para que nenhuma view sobre o buffer sobreviva ao `close`
+        genomes = PopulationBrain(weights_ih[start:stop].copy(), weights_ho[start:stop].copy())
+        del weights_ih, weights_ho
+    finally:
+        shm.close()
+    return evaluate_genomes(genomes, course_seeds, _worker_game, settings)
+
+def _shared_arrays(buffer, shapes):
+    """Cria as views `weights_ih` e `weights_ho` sobre um buffer compartilhado."""
+    shape_ih, shape_ho = shapes
+    size_ih = int(np.prod(shape_ih))
+    weights_ih = np.ndarray(shape_ih, dtype=np.float64, buffer=buffer)
+    weights_ho = np.ndarray(shape_ho, dtype=np.float64, buffer=buffer, offset=size_ih * 8)
+    return weights_ih, weights_ho
+
+
+class ParallelEvaluator:
+    """Distribui a avaliação de uma população entre `workers` processos.
+
+    O resultado é idêntico, bit a bit, ao de `evaluate_genomes` rodando em um
+    único processo com os mesmos `course_seeds`.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Os processos do pool precisam herdar o resource tracker do processo
+        # principal; senão cada um inicia o seu e acusa os blocos como vazados
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker)
+
+    def evaluate(self, genomes, course_seeds, settings=None):
+        """Avalia todos os genomas e retorna `(scores, pipes_passed)` na ordem dos slots de `Population`."""
+        shapes = (genomes.weights_ih.shape, genomes.weights_ho.shape)
+        nbytes = genomes.weights_ih.nbytes + genomes.weights_ho.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        try:
+            weights_ih, weights_ho = _shared_arrays(shm.buf, shapes)
+            weights_ih[:] = genomes.weights_ih
+            weights_ho[:] = genomes.weights_ho
+            del weights_ih, weights_ho
+
+            bounds = np.linspace(0, len(genomes), min(self.workers, len(genomes)) + 1).astype(int)
+            tasks = [(shm.name, shapes, int(start), int(stop), course_seeds, settings)
+                     for start, stop in zip(bounds[:-1], bounds[1:])]
+            results = self.pool.starmap(_evaluate_chunk, tasks)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        # Junta os blocos de genomas e achata para o layout percurso-major dos slots
+        scores = np.concatenate([score for score, _ in results], axis=1).ravel()
+        pipes_passed = np.concatenate([pipes for _, pipes in results], axis=1).ravel()
+        return scores, pipes_passed
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+
+from population import Population
+
+class PipeRing:
+    """Canos vivos em arrays de capacidade fixa, usados como fila circular.
+
+    O cano de número `i` do percurso ocupa a posição `i % capacity` de `x` e
+    de `top_heights` (uma linha por percurso); os vivos são os números de
+    `first` a `count - 1`, da esquerda para a direita. Uma posição livre tem
+    `x = -inf`, então pode entrar direto nas contas de colisão sem máscara.
+
+    Como todos os pássaros têm o mesmo x, o próximo cano à frente (`ahead`) e
+    os canos já ultrapassados (`passed`) são ponteiros que só avançam, e as
+    entradas da rede que dependem do cano (`features`) são calculadas uma vez
+    por frame para a população inteira.
+    """
+    SPEED = 2 # Pixels por frame
+
+    def __init__(self, config, courses=1, bird_x=Population.X):
+        self.config = config
+        self.bird_x = bird_x
+        self.capacity = self.capacity_for(config)
+        self.x = np.full(self.capacity, -np.inf)
+        self.top_heights = np.zeros((courses, self.capacity))
+        self.first = 0 # Número do cano vivo mais antigo
+        self.count = 0 # Canos que já surgiram
+        self.ahead = 0 # Número do próximo cano à frente dos pássaros
+        self.passed = 0 # Canos já contados como ultrapassados
+        # Entradas da rede por percurso: x do próximo cano, topo e base da abertura (normalizados)
+        self.features = np.full((courses, 3), 0.5)
+
+    @classmethod
+    def capacity_for(cls, config):
+        """Canos vivos ao mesmo tempo: os que cabem entre a borda direita e o fim da tela, mais um."""
+        lifetime = (config.GAME_WIDTH + config.PIPE_WIDTH) / cls.SPEED
+        return math.ceil(lifetime / config.PIPE_SPAWN_RATE) + 1
+
+    def __len__(self):
+        return self.count - self.first
+
+    def live_slots(self):
+        """Posições dos canos vivos, do mais à esquerda para o mais à direita."""
+        return np.arange(self.first, self.count) % self.capacity
+
+    def spawn(self, top_heights):
+        """Cria um cano na borda direita com a altura `top_heights` em cada percurso."""
+        slot = self.count % self.capacity
+        self.x[slot] = self.config.GAME_WIDTH
+        self.top_heights[:, slot] = top_heights
+        self.count += 1
+
+    def advance(self):
+        """Move os canos, libera os que saíram da tela e atualiza o próximo cano e `features`."""
+        config = self.config
+        self.x -= self.SPEED
+        while self.first < self.count and self.x[self.first % self.capacity] + config.PIPE_WIDTH <= 0:
+            self.x[self.first % self.capacity] = -np.inf
+            self.first += 1
+        while self.ahead < self.count and self.x[self.ahead % self.capacity] + config.PIPE_WIDTH <= self.bird_x:
+            self.ahead += 1
+
+        if self.ahead < self.count:
+            slot = self.ahead % self.capacity
+            top_height = self.top_heights[:, slot]
+            self.features[:, 0] = self.x[slot] / config.GAME_WIDTH
+            self.features[:, 1] = top_height / config.GAME_HEIGHT
+            self.features[:, 2] = (top_height + config.PIPE_GAP) / config.GAME_HEIGHT
+        else:
+            # Sem cano à frente, as entradas voltam ao valor neutro, como no início do episódio
+            self.features[:] = 0.5
+
+    def count_passed(self):
+        """Quantos canos ficaram para trás dos pássaros desde a última chamada."""
+        # Canos que saíram da tela sem serem contados (fora do treino) não contam mais
+        start = self.passed = max(self.passed, self.first)
+        while self.passed < self.count and self.x[self.passed % self.capacity] + self.config.PIPE_WIDTH < self.bird_x:
+            self.passed += 1
+        return self.passed - start
@@ -0,0 +1,137 @@
+import numpy as np
+from neural_network import PopulationBrain
+
+class Population:
+    """Estado de uma população de pássaros em arrays NumPy (structure of arrays).
+
+    Cada pássaro ocupa um índice fixo (`slot`) em `y`, `velocity`, `score`,
+    `pipes_passed`, `fitness` e `alive`. A física, a pontuação e as mortes são
+    aplicadas à população inteira em um único passo vetorizado por frame.
+    `Bird` continua existindo como uma view fina sobre um slot.
+
+    Com `courses` > 1, cada genoma ocupa um slot por percurso: o slot
+    `c * len(genomes) + i` é o genoma `i` no percurso `c`, e todos os
+    percursos são simulados juntos, no mesmo passo vetorizado.
+    """
+    X = 50
+    START_Y = 300
+    WIDTH = 34
+    HEIGHT = 24
+    GRAVITY = 0.25
+    LIFT = -6.5
+
+    INPUT_NODES = 5
+    HIDDEN_NODES = 8
+    OUTPUT_NODES = 1
+
+    def __init__(self, genomes, courses=1):
+        size = len(genomes) * courses
+        self.genomes = genomes # Cérebros de cada genoma (nunca compactado)
+        self.courses = courses
+        self.course = np.arange(size) // max(1, len(genomes)) # Percurso de cada slot
+        self.y = np.full(size, float(self.START_Y))
+        self.velocity = np.zeros(size)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.pipes_passed = np.zeros(size, dtype=np.int64)
+        self.fitness = np.zeros(len(genomes)) # Um valor por genoma
+        self.alive = np.ones(size, dtype=bool)
+        self.flapping = np.zeros(size, dtype=bool) # Última decisão de cada cérebro
+        self.copies = None # (destinos, origens): slots que recebem o resultado de outro slot ao fim do episódio
+
+        # Slots vivos, em ordem, e seus cérebros compactados para a inferência
+        self.slots = np.arange(size)
+        self.brain = PopulationBrain(np.tile(genomes.weights_ih, (courses, 1, 1)),
+                                     np.tile(genomes.weights_ho, (courses, 1, 1)))
+
+    @classmethod
+    def random(cls, size, rng=None, courses=1):
+        """Cria uma população com cérebros aleatórios."""
+        return cls(PopulationBrain.random(size, cls.INPUT_NODES, cls.HIDDEN_NODES, cls.OUTPUT_NODES, rng), courses)
+
+    @classmethod
+    def from_networks(cls, networks):
+        return cls(PopulationBrain.from_networks(networks))
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def alive_count(self):
+        return len(self.slots)
+
+    def genome_index(self, slot):
+        """Índice em `genomes` do pássaro que ocupa `slot`."""
+        return slot % len(self.genomes)
+
+    def alive_courses(self):
+        """Percurso de cada slot vivo (0 escalar quando há um só percurso)."""
+        return self.course[self.slots] if self.courses > 1 else 0
+
+    def genome_scores(self):
+        """Score e canos ultrapassados de cada genoma, em média sobre os percursos."""
+        if self.courses == 1:
+            return self.score, self.pipes_passed
+        shape = (self.courses, len(self.genomes))
+        return self.score.reshape(shape).mean(axis=0), self.pipes_passed.reshape(shape).mean(axis=0)
+
+    def get_inputs(self, pipe_features, canvas_height):
+        """Matriz de entradas (vivos x 5) equivalente a `Bird.get_inputs`.
+
+        `pipe_features` são as 3 entradas do próximo cano em cada percurso
+        (`PipeRing.features`), iguais para todos os pássaros do percurso.
+        """
+        inputs = np.empty((len(self.slots), self.INPUT_NODES))
+        inputs[:, 0] = self.y[self.slots] / canvas_height
+        inputs[:, 1] = self.velocity[self.slots] / 10
+        inputs[:, 2:] = pipe_features[self.alive_courses()]
+        return inputs
+
+    def think(self, inputs):
+        """Consulta todos os cérebros vivos de uma vez e aplica os pulos."""
+        flaps = self.brain.decide(inputs)
+        self.flapping[self.slots] = flaps
+        self.velocity[self.slots[flaps]] = self.LIFT
+
+    def repeat_action(self):
+        """Repete a última decisão de pulo de cada pássaro vivo, sem consultar a rede."""
+        slots = self.slots
+        self.velocity[slots[self.flapping[slots]]] = self.LIFT
+
+    def update(self):
+        """Aplica gravidade e pontuação a todos os pássaros vivos."""
+        slots = self.slots
+        self.score[slots] += 1
+        self.velocity[slots] += self.GRAVITY
+        self.y[slots] += self.velocity[slots]
+
+    def kill(self, dead):
+        """Marca como mortos os vivos cuja posição em `dead` (máscara sobre `slots`) é verdadeira."""
+        if not dead.any():
+            return
+        keep = ~dead
+        self.alive[self.slots[dead]] = False
+        self.slots = self.slots[keep]
+        self.brain.compact(keep)
+        if self.copies is not None and not len(self.slots):
+            destinations, sources = self.copies
+            self.score[destinations] = self.score[sources]
+            self.pipes_passed[destinations] = self.pipes_passed[sources]
+
+    def finish(self, slots, score, pipes_passed):
+        """Encerra os pássaros vivos de `slots` com um resultado já conhecido, sem simulá-los."""
+        self.score[slots] = score
+        self.pipes_passed[slots] = pipes_passed
+        self.kill(np.isin(self.slots, slots))
+
+    def add_pipe_passed(self, count=1):
+        """Conta `count` canos ultrapassados para todos os pássaros vivos."""
+        self.pipes_passed[self.slots] += count
+
+    def best_index(self, course=None):
+        """Índice do pássaro com maior score, priorizando os vivos (opcionalmente só no percurso `course`)."""
+        candidates = self.slots if len(self.slots) else np.arange(len(self))
+        if course is not None:
+            candidates = candidates[self.course[candidates] == course]
+        if not len(candidates):
+            return None
+        return int(candidates[np.argmax(self.score[candidates])])
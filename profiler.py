@@ -0,0 +1,202 @@
+"""Medição do tempo gasto em cada fase da simulação e do desenho.
+
+Ao ligar o `Profiler`, os métodos das fases (ver `_phases`) são trocados na
+classe por versões cronometradas; ao desligar, os originais voltam. Desligado,
+o custo é zero, pois o caminho quente não tem nenhuma verificação. Os tempos
+são inclusivos: `step` contém as fases da simulação, `draw` contém os
+`draw_*` e `think` contém `predict`.
+
+Também captura N quadros com `cProfile` sob demanda.
+"""
+import cProfile
+import csv
+import functools
+import io
+import json
+import pstats
+import time
+from collections import defaultdict
+
+from bird import Bird
+from neural_network import NeuralNetwork, PopulationBrain
+from population import Population
+
+def _phases(game_class):
+    """Lista de (fase, classe, método) cronometrados; `game_class` é a classe do jogo."""
+    return [
+        ('step', game_class, 'step'),
+        ('think', Population, 'get_inputs'),
+        ('think', Population, 'think'),
+        ('think', Bird, 'think'),
+        ('predict', PopulationBrain, 'decide'),
+        ('predict', NeuralNetwork, 'predict'),
+        ('physics', Population, 'update'),
+        ('physics', Population, 'repeat_action'),
+        ('physics', Bird, 'update'),
+        ('collision', game_class, '_check_population_collision'),
+        ('collision', game_class, '_check_collision'),
+        ('pipe_pass', game_class, '_check_pipe_pass'),
+        ('pipes', game_class, '_update_pipes'),
+        ('next_generation', game_class, 'next_generation'),
+        ('draw', game_class, 'draw'),
+        ('draw_game_area', game_class, '_draw_game_area'),
+        ('draw_pipes', game_class, '_draw_pipes'),
+        ('draw_birds', game_class, '_draw_birds'),
+        ('draw_ground', game_class, '_draw_ground'),
+        ('draw_overlays', game_class, '_draw_game_overlays'),
+        ('draw_overlay_message', game_class, '_draw_overlay_message'),
+        ('draw_ui_panel', game_class, '_draw_ui_panel'),
+        ('draw_stats', game_class, '_draw_stats_on_panel'),
+        ('draw_evolution_graph', game_class, '_draw_evolution_graph'),
+        ('draw_profiler_overlay', game_class, '_draw_profiler_overlay'),
+        ('draw_bottom_panel', game_class, '_draw_bottom_panel_info'),
+        ('draw_progress_bar', game_class, '_draw_progress_bar'),
+    ]
+
+class Profiler:
+    """Cronômetros por fase, com resumo ao vivo e histórico por geração.
+
+    Cada linha de `generations` tem o número da geração, os frames simulados
+    nela e os milissegundos de cada fase, incluindo o `next_generation` que a
+    encerrou.
+    """
+
+    # Intervalo, em segundos, entre atualizações do resumo ao vivo
+    SUMMARY_INTERVAL = 0.5
+
+    def __init__(self, game_class):
+        self.game_class = game_class
+        self.enabled = False
+        self.totals = defaultdict(float) # Segundos por fase na geração atual
+        self.calls = defaultdict(int)
+        self.generations = []
+        self.summary = [] # (fase, % do tempo, ms por chamada) da última janela, da fase mais cara para a mais barata
+        self._originals = []
+        self._window_totals = defaultdict(float)
+        self._window_calls = defaultdict(int)
+        self._window_start = time.perf_counter()
+        self._capture = None
+        self._capture_frames = 0
+        self._capture_file = None
+
+    # --- Cronômetros ---
+
+    def enable(self):
+        """Troca os métodos das fases pelas versões cronometradas."""
+        if self.enabled:
+            return
+        for phase, cls, name in _phases(self.game_class):
+            original = cls.__dict__[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self._timed(phase, original))
+        self.enabled = True
+        self._window_totals.clear()
+        self._window_calls.clear()
+        self._window_start = time.perf_counter()
+
+    def disable(self):
+        """Devolve os métodos originais."""
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+        self.enabled = False
+        self.summary = []
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def _timed(self, phase, function):
+        totals, calls = self.totals, self.calls
+        window_totals, window_calls = self._window_totals, self._window_calls
+        clock = time.perf_counter
+        closes_generation = phase == 'next_generation'
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                totals[phase] += elapsed
+                calls[phase] += 1
+                window_totals[phase] += elapsed
+                window_calls[phase] += 1
+                if closes_generation:
+                    # `next_generation` já avançou o contador: a geração encerrada é a anterior
+                    self.end_generation(args[0].generation - 1)
+        return timed
+
+    def end_generation(self, generation):
+        """Fecha a linha de `generation` no histórico e zera os totais."""
+        row = {'generation': generation, 'frames': self.calls['pipes']}
+        row.update({phase: round(seconds * 1000, 3) for phase, seconds in sorted(self.totals.items())})
+        self.generations.append(row)
+        self.totals.clear()
+        self.calls.clear()
+
+    def update_summary(self):
+        """Recalcula `summary`, no máximo a cada SUMMARY_INTERVAL segundos; indica se mudou."""
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if not self.enabled or elapsed < self.SUMMARY_INTERVAL:
+            return False
+        self.summary = [
+            (phase, 100 * seconds / elapsed, 1000 * seconds / self._window_calls[phase])
+            for phase, seconds in sorted(self._window_totals.items(), key=lambda item: -item[1])
+        ]
+        self._window_totals.clear()
+        self._window_calls.clear()
+        self._window_start = now
+        return True
+
+    def export(self, path, current_generation=None):
+        """Grava o histórico por geração em CSV (se `path` termina em .csv) ou JSON.
+
+        Com `current_generation`, os tempos da geração em andamento entram
+        como a última linha.
+        """
+        if current_generation is not None and self.calls:
+            self.end_generation(current_generation)
+        if path.endswith('.csv'):
+            phases = sorted({key for row in self.generations for key in row} - {'generation', 'frames'})
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=['generation', 'frames'] + phases, restval=0)
+                writer.writeheader()
+                writer.writerows(self.generations)
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.generations, f, indent=2)
+
+    # --- cProfile ---
+
+    @property
+    def capturing(self):
+        return self._capture is not None
+
+    def start_capture(self, frames, filename=None):
+        """Liga o `cProfile` pelos próximos `frames` quadros (contados por `frame_done`)."""
+        if self._capture is not None:
+            return
+        self._capture_frames = frames
+        self._capture_file = filename or time.strftime("profile_%Y%m%d_%H%M%S.prof")
+        self._capture = cProfile.Profile()
+        self._capture.enable()
+
+    def frame_done(self):
+        """Conta um quadro da captura; no último, grava o `.prof` e mostra as funções mais caras."""
+        if self._capture is None:
+            return
+        self._capture_frames -= 1
+        if self._capture_frames > 0:
+            return
+        self._capture.disable()
+        self._capture.dump_stats(self._capture_file)
+        report = io.StringIO()
+        pstats.Stats(self._capture, stream=report).sort_stats('cumulative').print_stats(15)
+        print(report.getvalue())
+        print(f"Perfil do cProfile salvo em '{self._capture_file}'")
+        self._capture = None
@@ -0,0 +1,171 @@
+"""Gravação compacta de episódios e reprodução só com a física.
+
+Um replay é a semente do percurso mais um bit por frame dizendo se o pássaro
+pulou naquele frame. Como os canos e a física são determinísticos, isso basta
+para refazer o voo exato sem consultar a rede neural: a 60 frames por
+segundo, são 7,5 bytes por segundo de jogo.
+
+O arquivo `.replay` tem um cabeçalho fixo (assinatura, versão e tamanho), os
+metadados em JSON e os bits dos pulos compactados com `np.packbits`.
+
+Exemplos:
+    python replay.py info replays/geracao_00010.replay
+    python replay.py verify replays/*.replay
+    python flappy_bird_ai.py --replay replays/geracao_00010.replay
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b'FBRP'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sBI') # Assinatura, versão e tamanho dos metadados JSON
+
+class Replay:
+    """Pulos de um pássaro a cada frame de um episódio, no percurso `course_seed`.
+
+    `score` e `pipes_passed` são os do treino, para conferir a reprodução.
+    """
+
+    def __init__(self, course_seed, flaps, generation=None, score=None, pipes_passed=None):
+        self.course_seed = int(course_seed)
+        self.flaps = np.asarray(flaps, dtype=bool)
+        self.generation = generation
+        self.score = score
+        self.pipes_passed = pipes_passed
+
+    @property
+    def frames(self):
+        return len(self.flaps)
+
+    def save(self, path):
+        metadata = {
+            'course_seed': self.course_seed,
+            'frames': self.frames,
+            'generation': self.generation,
+            'score': self.score,
+            'pipes_passed': self.pipes_passed,
+        }
+        header = json.dumps(metadata).encode()
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(np.packbits(self.flaps).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, version, header_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"'{path}' não é um arquivo de replay")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Versão de replay não suportada: {version}")
+            metadata = json.loads(f.read(header_size))
+            packed = np.frombuffer(f.read(), dtype=np.uint8)
+        flaps = np.unpackbits(packed, count=metadata['frames']).astype(bool)
+        return cls(metadata['course_seed'], flaps, metadata['generation'], metadata['score'], metadata['pipes_passed'])
+
+
+class ReplayRecorder:
+    """Grava, a cada frame, os pulos aplicados pelos pássaros vivos de uma população.
+
+    Cada frame guarda só um bit por pássaro vivo (ou nada, se ninguém pulou).
+    Os vivos de um frame não precisam ser guardados: são os slots vivos no
+    início do episódio cujo score final chega àquele frame, então a posição
+    de um pássaro em cada frame sai dos scores da população ao fim.
+    """
+
+    def __init__(self):
+        self.population = None
+        self._initial = np.empty(0, dtype=np.intp) # Slots vivos no início do episódio (em ordem)
+        self._frames = []
+
+    def start(self, population):
+        """Começa a gravar um episódio de `population`."""
+        self.population = population
+        self._initial = population.slots.copy()
+        self._frames = []
+
+    def record(self, population, flapped=None):
+        """Grava um frame; `flapped` é a máscara (sobre os vivos) dos que pularam, ou None se ninguém pulou."""
+        if population is not self.population:
+            return
+        self._frames.append(np.packbits(flapped).tobytes() if flapped is not None and flapped.any() else None)
+
+    def replay(self, slot, course_seed, generation=None):
+        """Replay do pássaro em `slot`, ou None se ele não foi simulado nesta gravação do começo ao fim."""
+        population = self.population
+        score = int(population.score[slot])
+        index = int(np.searchsorted(self._initial, slot))
+        if index == len(self._initial) or self._initial[index] != slot or score > len(self._frames):
+            return None
+
+        # No frame f (a partir de 1), estão vivos os slots iniciais com score >= f
+        lower = np.sort(population.score[self._initial[:index]])
+        positions = index - np.searchsorted(lower, np.arange(1, score + 1))
+        flaps = np.zeros(score, dtype=bool)
+        for frame, position in enumerate(positions.tolist()):
+            packed = self._frames[frame]
+            if packed is not None:
+                flaps[frame] = packed[position >> 3] >> (7 - (position & 7)) & 1
+        return Replay(course_seed, flaps, generation, score, int(population.pipes_passed[slot]))
+
+
+def record_replay(genome, course_seed, settings=None, generation=None):
+    """Simula de novo um único genoma (PopulationBrain de uma linha) e devolve o seu replay.
+
+    Usado quando o episódio não foi gravado, por exemplo quando foi avaliado
+    em outros processos ou veio do cache de fitness.
+    """
+    from flappy_bird_ai import FlappyBirdAI
+    from population import Population
+
+    game = FlappyBirdAI(headless=True)
+    for name, value in (settings or {}).items():
+        setattr(game.config, name, value)
+    game.fitness_cache = None
+    game.replay_recorder = ReplayRecorder()
+    game.run_episode(Population(genome), [course_seed])
+    return game.replay_recorder.replay(0, course_seed, generation)
+
+
+def play(replay):
+    """Reproduz `replay` sem desenhar e retorna `(score, pipes_passed)` obtidos só com a física."""
+    from flappy_bird_ai import FlappyBirdAI
+
+    game = FlappyBirdAI(headless=True)
+    game.start_replay(replay)
+    while not game.replay_finished:
+        game.step()
+    return int(game.replay_bird.score), int(game.replay_bird.pipes_passed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informações e conferência de replays do Flappy Bird AI.")
+    parser.add_argument('command', choices=['info', 'verify'],
+                        help="'info' mostra os metadados; 'verify' reproduz só com a física e compara com o treino")
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    for path in args.files:
+        replay = Replay.load(path)
+        line = (f"{path}: geração {replay.generation}, semente {replay.course_seed}, {replay.frames} frames, "
+                f"score {replay.score}, {replay.pipes_passed} canos, {os.path.getsize(path)} bytes")
+        if args.command == 'verify':
+            result = play(replay)
+            matches = result == (replay.score, replay.pipes_passed)
+            mismatches += not matches
+            line += f" -> reproduzido: score {result[0]}, {result[1]} canos {'OK' if matches else 'DIFERENTE'}"
+        print(line)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    main()
@@ -0,0 +1,50 @@
+"""Cálculo vetorizado do fitness e estratégias de seleção de pais.
+
+Todas as funções recebem o fitness da população como array e sorteiam todos
+os pais de uma vez, devolvendo seus índices.
+"""
+import numpy as np
+
+def compute_fitness(scores, pipes_passed, enhanced=False):
+    """Fitness normalizado (soma 1) a partir do score ao quadrado.
+
+    Com `enhanced`, cada cano ultrapassado vale 100 pontos extras de score.
+    """
+    raw_scores = scores + pipes_passed * 100 if enhanced else scores
+    squared = raw_scores.astype(np.float64) ** 2
+    total = squared.sum()
+    if total == 0:
+        return np.full(len(squared), 1 / len(squared))
+    return squared / total
+
+def roulette_select(fitness, count, rng, **_):
+    """Roleta: soma cumulativa + busca binária, O(log N) por pai."""
+    cumulative = np.cumsum(fitness)
+    picks = rng.random(count) * cumulative[-1]
+    return np.minimum(np.searchsorted(cumulative, picks), len(fitness) - 1)
+
+def sus_select(fitness, count, rng, **_):
+    """Amostragem universal estocástica: `count` ponteiros igualmente espaçados na roleta."""
+    cumulative = np.cumsum(fitness)
+    spacing = cumulative[-1] / count
+    pointers = (rng.random() + np.arange(count)) * spacing
+    return np.minimum(np.searchsorted(cumulative, pointers), len(fitness) - 1)
+
+def tournament_select(fitness, count, rng, tournament_size=3):
+    """Torneio: o melhor de `tournament_size` pássaros sorteados vence."""
+    contestants = rng.integers(0, len(fitness), size=(count, tournament_size))
+    winners = np.argmax(fitness[contestants], axis=1)
+    return contestants[np.arange(count), winners]
+
+SELECTION_STRATEGIES = {
+    'roulette': ('Roleta', roulette_select),
+    'sus': ('SUS', sus_select),
+    'tournament': ('Torneio', tournament_select),
+}
+
+def select_parents(strategy, fitness, count, rng, tournament_size=3):
+    """Sorteia `count` índices de pais com a estratégia indicada."""
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    _, select = SELECTION_STRATEGIES[strategy]
+    return select(fitness, count, rng, tournament_size=tournament_size)
@@ -0,0 +1,64 @@
+"""Confere `CollisionEngine.death_mask` com a regra antiga de colisão, pássaro a pássaro e cano a cano."""
+import itertools
+
+import numpy as np
+import pytest
+
+from collision import CollisionEngine
+from config import Config
+from population import Population
+
+def reference_collides(y, pipes, config=Config):
+    """Regra de antes da vetorização: `Bird.is_offscreen` e depois `Bird.collides_with` em cada cano."""
+    x, width, height = Population.X, Population.WIDTH, Population.HEIGHT
+    if y + height > config.GAME_HEIGHT - config.GROUND_HEIGHT or y < 0:
+        return True
+    for pipe in pipes:
+        if (x < pipe['x'] + config.PIPE_WIDTH and
+            x + width > pipe['x'] and
+            (y < pipe['top_height'] or
+             y + height > pipe['top_height'] + config.PIPE_GAP)):
+            return True
+    return False
+
+def _engine(pipe_x, top_heights):
+    engine = CollisionEngine(Config, Population.X, Population.WIDTH, Population.HEIGHT)
+    engine.set_pipes(np.asarray(pipe_x, dtype=np.float64), np.atleast_2d(np.asarray(top_heights, dtype=np.float64)))
+    return engine
+
+def _assert_matches(engine, y, course=0):
+    """Compara a máscara do motor com a regra antiga para cada posição de `y`."""
+    mask = engine.death_mask(y, course)
+    courses = np.broadcast_to(course, y.shape)
+    for i, (position, row) in enumerate(zip(y.tolist(), courses.tolist())):
+        pipes = [{'x': x, 'top_height': top} for x, top in zip(engine.pipe_x, engine.top_height[row]) if np.isfinite(x)]
+        assert mask[i] == reference_collides(position, pipes), (position, pipes)
+
+def test_random_positions():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        count = rng.integers(0, 5)
+        pipe_x = rng.uniform(-Config.PIPE_WIDTH - 10, Config.GAME_WIDTH, size=count)
+        # Posições livres do `PipeRing` têm x = -inf
+        pipe_x[rng.random(count) < 0.2] = -np.inf
+        top_heights = rng.uniform(50, Config.GAME_HEIGHT - Config.GROUND_HEIGHT - Config.PIPE_GAP - 50, size=(3, count))
+        engine = _engine(pipe_x, top_heights)
+        y = rng.uniform(-30, Config.GAME_HEIGHT + 30, size=100)
+        _assert_matches(engine, y)
+        _assert_matches(engine, y, rng.integers(0, 3, size=len(y)))
+
+# Bordas horizontais: o cano encostando no pássaro por um lado ou pelo outro, e um pixel além
+EDGE_X = [Population.X + offset + delta
+          for offset in (Population.WIDTH, Config.PIPE_WIDTH, -Config.PIPE_WIDTH)
+          for delta in (-1, -0.5, 0, 0.5, 1)]
+
+@pytest.mark.parametrize('pipe_x', EDGE_X)
+def test_boundary_positions(pipe_x):
+    top = 200.0
+    floor = Config.GAME_HEIGHT - Config.GROUND_HEIGHT
+    # Bordas verticais: topo e base da abertura, chão e teto, exatamente e um pouco para cada lado
+    edges = [top, top + Config.PIPE_GAP - Population.HEIGHT, floor - Population.HEIGHT, 0.0]
+    y = np.array([edge + delta for edge, delta in itertools.product(edges, (-1, -1e-9, 0, 1e-9, 1))])
+    _assert_matches(_engine([pipe_x], [top]), y)
+    # O mesmo cano junto com uma posição livre e um cano longe dos pássaros
+    _assert_matches(_engine([-np.inf, pipe_x, Config.GAME_WIDTH], [0, top, 10]), y)
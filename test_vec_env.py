@@ -0,0 +1,47 @@
+"""Confere que `VecEnv` e o treino (`PipeRing`, `CollisionEngine`, `Population`) dão os mesmos resultados."""
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pytest
+
+from config import Config
+from neural_network import PopulationBrain
+from parallel import evaluate_genomes
+from population import Population
+from vec_env import VecEnv
+
+COURSE_SEED = 12345
+
+def _vec_env_scores(genomes, config):
+    """Joga um genoma por ambiente, todos no percurso COURSE_SEED, até todos terminarem."""
+    env = VecEnv(len(genomes), config, max_frames=config.MAX_EPISODE_FRAMES)
+    observation = env.reset(COURSE_SEED)
+    while not env.done.all():
+        observation, _, _ = env.step(genomes.decide(observation))
+    return env.score, env.pipes_passed
+
+def _random_genomes():
+    return PopulationBrain.random(300, Population.INPUT_NODES, Population.HIDDEN_NODES, Population.OUTPUT_NODES,
+                                  np.random.default_rng(0))
+
+def _trained_genomes():
+    """Genomas de poucas gerações de treino, que já passam de canos."""
+    from headless import HeadlessTrainer
+    trainer = HeadlessTrainer(300, Config.MUTATION_RATE, ['elitism'], seed=0, fitness_cache=0)
+    for _ in trainer.run(6):
+        pass
+    return trainer.game.population.genomes
+
+@pytest.mark.parametrize('spawn_rate', [Config.PIPE_SPAWN_RATE, 400])
+@pytest.mark.parametrize('make_genomes', [_random_genomes, _trained_genomes])
+def test_vec_env_matches_training(make_genomes, spawn_rate):
+    # Com canos espaçados, há frames sem cano à frente, em que as entradas voltam a 0.5
+    config = type('SpacedConfig', (Config,), {'PIPE_SPAWN_RATE': spawn_rate})
+    genomes = make_genomes()
+    scores, pipes_passed = evaluate_genomes(genomes, [COURSE_SEED], settings={'PIPE_SPAWN_RATE': spawn_rate})
+    vec_scores, vec_pipes_passed = _vec_env_scores(genomes, config)
+    np.testing.assert_array_equal(vec_scores, scores[0])
+    np.testing.assert_array_equal(vec_pipes_passed, pipes_passed[0])
+    assert scores.max() > scores.min()
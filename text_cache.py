@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+class TextCache:
+    """Cache LRU de superfícies de texto já renderizadas.
+
+    A chave é (fonte, texto, cor): textos que se repetem entre frames, como
+    rótulos e linhas de estatística que não mudaram, são renderizados uma vez
+    só. Quando o cache passa de `max_entries`, o texto usado há mais tempo sai.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color):
+        """Equivalente a `font.render(text, True, color)`, reaproveitando a superfície se possível."""
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
@@ -0,0 +1,175 @@
+"""Ambiente vetorizado: N partidas independentes de Flappy Bird em arrays NumPy.
+
+Não depende do pygame nem de `FlappyBirdAI`: cada ambiente tem seu próprio
+percurso (`Course`), seu próprio contador de frames e seus próprios canos,
+guardados em arrays de tamanho fixo `(N, canos)`. A física, os canos e as
+colisões seguem as mesmas regras do jogo, frame a frame.
+
+As regras de referência são as do treino: `PipeRing` (canos e entradas da
+rede), `CollisionEngine` (colisões) e `Population` (física). Este módulo as
+reimplementa porque cada ambiente tem o seu próprio frame, mas usa as mesmas
+constantes (`PipeRing.SPEED` e `PipeRing.capacity_for`), e `test_vec_env.py`
+confere que os resultados são iguais aos de `parallel.evaluate_genomes`.
+
+Exemplo:
+    env = VecEnv(100)
+    obs = env.reset(seeds)
+    while not env.done.all():
+        obs, reward, done = env.step(brain.decide(obs))
+"""
+import numpy as np
+
+from config import Config
+from course import Course
+from pipes import PipeRing
+from population import Population
+
+class VecEnv:
+    """N partidas com `reset(seeds)` e `step(actions)` em lote.
+
+    A observação de cada ambiente são as 5 entradas de `Bird.get_inputs`
+    (altura, velocidade, x do próximo cano, topo e base da abertura,
+    normalizados). A recompensa é 1 por frame jogado, então a soma de um
+    episódio é o score do pássaro. Um ambiente terminado fica parado, com
+    recompensa 0, até ser reiniciado por `reset`.
+    """
+    def __init__(self, num_envs, config=Config, max_frames=Config.MAX_EPISODE_FRAMES):
+        self.num_envs = num_envs
+        self.config = config
+        self.max_frames = max_frames # None ou 0 desliga o limite de frames por episódio
+        self.pipe_slots = PipeRing.capacity_for(config)
+
+        self.courses = [None] * num_envs
+        self._heights = np.zeros((num_envs, 0), dtype=np.int16) # Alturas de cada percurso, por índice de cano
+        self._lengths = np.zeros(num_envs, dtype=np.int64) # Alturas já copiadas de cada percurso
+        self.frame = np.zeros(num_envs, dtype=np.int64)
+        self.y = np.full(num_envs, float(Population.START_Y))
+        self.velocity = np.zeros(num_envs)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.pipes_passed = np.zeros(num_envs, dtype=np.int64)
+        self.done = np.ones(num_envs, dtype=bool)
+        self.pipe_count = np.zeros(num_envs, dtype=np.int64)
+        self.pipe_x = np.zeros((num_envs, self.pipe_slots))
+        self.pipe_top = np.zeros((num_envs, self.pipe_slots))
+        self.pipe_active = np.zeros((num_envs, self.pipe_slots), dtype=bool)
+        self.pipe_passed = np.zeros((num_envs, self.pipe_slots), dtype=bool)
+        self.observation = np.full((num_envs, Population.INPUT_NODES), 0.5)
+
+    def reset(self, seeds, envs=None):
+        """Começa episódios novos nos percursos `seeds` e retorna as observações de todos os ambientes.
+
+        `envs` (índices ou máscara) escolhe quais ambientes reiniciar; por
+        padrão, todos. `seeds` tem uma semente por ambiente reiniciado.
+        """
+        envs = np.arange(self.num_envs)[envs] if envs is not None else np.arange(self.num_envs)
+        seeds = np.broadcast_to(np.asarray(seeds), envs.shape)
+        for env, seed in zip(envs, seeds):
+            self.courses[env] = Course(int(seed), self.config)
+        self._sync_heights(envs)
+
+        self.frame[envs] = 0
+        self.y[envs] = Population.START_Y
+        self.velocity[envs] = 0
+        self.score[envs] = 0
+        self.pipes_passed[envs] = 0
+        self.done[envs] = False
+        self.pipe_count[envs] = 0
+        self.pipe_active[envs] = False
+        self.pipe_passed[envs] = False
+
+        # Como no jogo, o primeiro frame já tem os canos andados antes da primeira decisão
+        started = np.zeros(self.num_envs, dtype=bool)
+        started[envs] = True
+        self._advance_pipes(started)
+        self._observe(started)
+        return self.observation.copy()
+
+    def step(self, actions):
+        """Aplica os pulos `actions` (bool por ambiente) e avança um frame.
+
+        Retorna `(observation, reward, done)`. A observação já é a do frame
+        seguinte, pronta para a próxima decisão.
+        """
+        running = ~self.done
+        flapping = np.asarray(actions, dtype=bool) & running
+        self.velocity[flapping] = Population.LIFT
+        self.score[running] += 1
+        self.velocity[running] += Population.GRAVITY
+        self.y[running] += self.velocity[running]
+        reward = running.astype(np.float64)
+
+        dead = running & self._collides()
+        alive = running & ~dead
+        self._count_passed_pipes(alive)
+        if self.max_frames:
+            alive &= self.frame < self.max_frames
+        self.done |= running & ~alive
+
+        self._advance_pipes(alive)
+        self._observe(alive)
+        return self.observation.copy(), reward, self.done.copy()
+
+    def _sync_heights(self, envs):
+        """Copia as alturas dos percursos de `envs` para a matriz usada no surgimento dos canos."""
+        length = max(self._heights.shape[1], max(len(self.courses[env]) for env in envs))
+        if length > self._heights.shape[1]:
+            self._heights = np.pad(self._heights, ((0, 0), (0, length - self._heights.shape[1])))
+        for env in envs:
+            course = self.courses[env]
+            self._heights[env, :len(course)] = course.top_heights
+            self._lengths[env] = len(course)
+
+    def _advance_pipes(self, envs):
+        """Avança o frame de `envs` (máscara): cria, move e remove canos como `_update_pipes`."""
+        self.frame[envs] += 1
+        spawning = np.flatnonzero(envs & (self.frame % self.config.PIPE_SPAWN_RATE == 0))
+        if len(spawning):
+            index = self.pipe_count[spawning]
+            short = spawning[index >= self._lengths[spawning]]
+            if len(short):
+                for env in short:
+                    self.courses[env].top_height(int(self.pipe_count[env]))
+                self._sync_heights(short)
+            slot = index % self.pipe_slots
+            self.pipe_x[spawning, slot] = self.config.GAME_WIDTH
+            self.pipe_top[spawning, slot] = self._heights[spawning, index]
+            self.pipe_active[spawning, slot] = True
+            self.pipe_passed[spawning, slot] = False
+            self.pipe_count[spawning] += 1
+
+        self.pipe_x[envs] -= PipeRing.SPEED
+        self.pipe_active &= ~(envs[:, np.newaxis] & (self.pipe_x + self.config.PIPE_WIDTH <= 0))
+
+    def _collides(self):
+        """Máscara dos ambientes cujo pássaro bate no chão, no teto ou em um cano (regras de `CollisionEngine`)."""
+        config = self.config
+        floor = config.GAME_HEIGHT - config.GROUND_HEIGHT
+        offscreen = (self.y + Population.HEIGHT > floor) | (self.y < 0)
+        overlaps_x = (self.pipe_active & (Population.X < self.pipe_x + config.PIPE_WIDTH)
+                      & (Population.X + Population.WIDTH > self.pipe_x))
+        column = self.y[:, np.newaxis]
+        hits_pipe = overlaps_x & ((column < self.pipe_top) | (column + Population.HEIGHT > self.pipe_top + config.PIPE_GAP))
+        return offscreen | hits_pipe.any(axis=1)
+
+    def _count_passed_pipes(self, alive):
+        """Conta os canos que acabaram de ficar para trás, para os pássaros ainda vivos."""
+        passing = self.pipe_active & ~self.pipe_passed & (self.pipe_x + self.config.PIPE_WIDTH < Population.X)
+        self.pipe_passed |= passing
+        self.pipes_passed[alive] += passing[alive].sum(axis=1)
+
+    def _observe(self, envs):
+        """Recalcula as observações de `envs` (máscara) a partir do cano mais próximo à frente."""
+        config = self.config
+        ahead = self.pipe_active & (self.pipe_x + config.PIPE_WIDTH > Population.X)
+        closest = np.argmin(np.where(ahead, self.pipe_x, np.inf), axis=1)
+        rows = np.arange(self.num_envs)
+        has_pipe = ahead[rows, closest]
+        top = self.pipe_top[rows, closest]
+
+        observation = np.full((self.num_envs, Population.INPUT_NODES), 0.5)
+        observation[:, 0] = self.y / config.GAME_HEIGHT
+        observation[:, 1] = self.velocity / 10
+        observation[has_pipe, 2] = self.pipe_x[has_pipe, closest[has_pipe]] / config.GAME_WIDTH
+        observation[has_pipe, 3] = top[has_pipe] / config.GAME_HEIGHT
+        observation[has_pipe, 4] = (top[has_pipe] + config.PIPE_GAP) / config.GAME_HEIGHT
+        self.observation[envs] = observation[envs]